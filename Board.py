@@ -1,6 +1,63 @@
+import base64
+from functools import lru_cache
+
 import numpy as np
 
 
+@lru_cache(maxsize=None)
+def winning_lines(rows: int, cols: int, win_length: int = 4) -> np.ndarray:
+    """Get the flat cell indices of every winning line on a board.
+
+    The lines are computed once per (rows, cols, win_length) triple and cached,
+    so win checks only have to gather the board through this index array.
+
+    Args:
+        rows (int): The number of rows in the board.
+        cols (int): The number of columns in the board.
+        win_length (int, optional): The number of pieces in a row needed to win. Defaults to 4.
+
+    Returns:
+        np.ndarray: A read-only array of shape (n_lines, win_length) holding the
+            flat (row-major) indices of the cells of each line.
+    """
+    cells = np.arange(rows * cols).reshape(rows, cols)
+    steps = np.arange(win_length)
+    lines = []
+    for dr, dc in ((0, 1), (1, 0), (1, 1), (-1, 1)):
+        # Starting cells from which a full line fits inside the board
+        r_start = (win_length - 1) if dr < 0 else 0
+        r_stop = rows if dr < 0 else rows - dr * (win_length - 1)
+        c_stop = cols - dc * (win_length - 1)
+        for r in range(r_start, r_stop):
+            for c in range(c_stop):
+                lines.append(cells[r + dr * steps, c + dc * steps])
+    lines = np.array(lines, dtype=np.intp).reshape(-1, win_length)
+    lines.setflags(write=False)
+    return lines
+
+
+@lru_cache(maxsize=None)
+def cell_lines(rows: int, cols: int, win_length: int = 4) -> tuple:
+    """Get the indices of the winning lines through each cell of a board.
+
+    Args:
+        rows (int): The number of rows in the board.
+        cols (int): The number of columns in the board.
+        win_length (int, optional): The number of pieces in a row needed to win. Defaults to 4.
+
+    Returns:
+        tuple: For each flat (row-major) cell index, a read-only array of the indices into
+            `winning_lines` of the lines that pass through the cell.
+    """
+    lines = winning_lines(rows, cols, win_length)
+    through = []
+    for cell in range(rows * cols):
+        indices = np.flatnonzero(np.any(lines == cell, axis=1))
+        indices.setflags(write=False)
+        through.append(indices)
+    return tuple(through)
+
+
 class Board:
     """
     A class to represent a Connect Four board.
@@ -8,12 +65,24 @@ class Board:
     Attributes:
         rows (int): The number of rows in the board.
         cols (int): The number of columns in the board.
+        win_length (int): The number of pieces in a row needed to win.
         values (list): The possible values that can be placed on the board.
         board (np.ndarray): The game board represented as a 2D NumPy array.
 
     Methods:
         get_board(): Get the board
         set_board(row, col, value): Set the board
+        lines(): Get the cached winning lines for the board.
+        mirrored(): Returns the board reflected left to right.
+        is_symmetric(): Checks if the board equals its mirror image.
+        is_canonical(): Checks if the board is the canonical one of its mirror pair.
+        canonical_key(): Returns a hashable key shared by the board and its mirror.
+        encode(): Returns the board packed into a compact base64 string.
+        decode(encoded, rows, cols, win_length): Builds a board from an encoded string.
+        line_counts(): Returns the number of pieces of each player in every winning line.
+        threats(player): Returns the empty cells where the player would complete a line.
+        winning_moves(player): Returns the columns where the player wins at once.
+        losing_moves(player): Returns the columns that let the opponent win on top.
         print_board(): Prints the current state of the board.
         final_move(move): Checks if the given move results in a winning streak.
         valid_move(col): Checks if a move in the specified column is valid.
@@ -21,18 +90,21 @@ class Board:
         get_next_open_row(col): Finds the next open row in the specified column.
     """
 
-    def __init__(self, rows: int = 6, cols: int = 5):
+    def __init__(self, rows: int = 6, cols: int = 5, win_length: int = 4):
         """Initialize a new Connect Four board.
 
         Args:
             rows (int, optional): The number of rows in the board. Defaults to 5.
             cols (int, optional): The number of columns in the board. Defaults to 6.
+            win_length (int, optional): The number of pieces in a row needed to win. Defaults to 4.
         """
         self.rows = rows
         self.cols = cols
+        self.win_length = win_length
         self.values = [0, 1, 2]
         self.shapes = [rows, cols]
         self.board = np.full((rows, cols), 2, dtype=int)
+        self._line_counts = None
 
     def set_whole_board(self, board):
         """
@@ -52,6 +124,171 @@ class Board:
         self.rows = board.shape[0]
         self.cols = board.shape[1]
         self.shapes = [board.shape[0], board.shape[1]]
+        self._line_counts = None
+
+    def lines(self) -> np.ndarray:
+        """Get the cached winning lines for this board's size and win length.
+
+        Returns:
+            np.ndarray: The flat cell indices of every winning line, see `winning_lines`.
+        """
+        return winning_lines(self.rows, self.cols, self.win_length)
+
+    def mirrored(self):
+        """Get a copy of the board reflected left to right.
+
+        Returns:
+            Board: A new board whose column c holds this board's column cols - 1 - c.
+        """
+        mirror = Board(self.rows, self.cols, self.win_length)
+        mirror.set_whole_board(np.ascontiguousarray(self.board[:, ::-1]))
+        return mirror
+
+    def mirror_col(self, col: int) -> int:
+        """Map a column to its position on the mirrored board.
+
+        Args:
+            col (int): The column index.
+
+        Returns:
+            int: The column index after a left-right reflection.
+        """
+        return self.cols - 1 - col
+
+    def is_symmetric(self) -> bool:
+        """Check if the board is unchanged by a left-right reflection.
+
+        Returns:
+            bool: True if the board equals its mirror image, False otherwise.
+        """
+        return np.array_equal(self.board, self.board[:, ::-1])
+
+    def is_canonical(self) -> bool:
+        """Check if the board is the canonical orientation of its mirror pair.
+
+        The canonical orientation is the one whose cells compare smaller in row-major order.
+
+        Returns:
+            bool: True if the board is canonical, False if its mirror is.
+        """
+        return self.board.tobytes() <= self.board[:, ::-1].tobytes()
+
+    def canonical_key(self) -> tuple:
+        """Get a hashable key shared by the board and its mirror image.
+
+        Returns:
+            tuple: The board size, win length and the cells of the canonical orientation.
+        """
+        cells = min(self.board.tobytes(), self.board[:, ::-1].tobytes())
+        return self.rows, self.cols, self.win_length, cells
+
+    def encode(self) -> str:
+        """Pack the board into a compact base64 string.
+
+        The string holds two bitboards, one per player, each a row-major bitmask of the
+        cells owned by that player packed into ceil(rows * cols / 8) bytes (most significant
+        bit first). Player 0's bitboard comes first; cells in neither bitboard are empty.
+
+        Returns:
+            str: The base64 encoded pair of bitboards.
+        """
+        cells = self.board.ravel()
+        planes = np.concatenate((np.packbits(cells == 0), np.packbits(cells == 1)))
+        return base64.b64encode(planes.tobytes()).decode("ascii")
+
+    @staticmethod
+    def decode(encoded: str, rows: int, cols: int, win_length: int = 4):
+        """Build a board from a string produced by `encode`.
+
+        Args:
+            encoded (str): The base64 encoded pair of bitboards.
+            rows (int): The number of rows in the board.
+            cols (int): The number of columns in the board.
+            win_length (int, optional): The number of pieces in a row needed to win. Defaults to 4.
+
+        Returns:
+            Board: The decoded board.
+        """
+        planes = np.frombuffer(base64.b64decode(encoded), dtype=np.uint8)
+        size = rows * cols
+        plane_bytes = (size + 7) // 8
+        cells = np.full(size, 2, dtype=int)
+        cells[np.unpackbits(planes[:plane_bytes], count=size).astype(bool)] = 0
+        cells[np.unpackbits(planes[plane_bytes:], count=size).astype(bool)] = 1
+        board = Board(rows, cols, win_length)
+        board.set_whole_board(cells.reshape(rows, cols))
+        return board
+
+    def line_counts(self) -> np.ndarray:
+        """Get the number of pieces each player has in every winning line.
+
+        The counts are computed from the board on the first call and then kept up to date
+        by `set_board`, which only touches the lines through the changed cell. Copies of the
+        board carry their counts along, so boards derived from one another move by move
+        never recount. Replacing the cells with `set_whole_board` drops the counts.
+
+        Returns:
+            np.ndarray: An array of shape (n_lines, 2) holding player 0's and player 1's
+                piece count in each line of `lines`; do not modify it.
+        """
+        if self._line_counts is None:
+            cells = self.board.ravel()[self.lines()]
+            self._line_counts = np.stack(
+                (np.count_nonzero(cells == 0, axis=1), np.count_nonzero(cells == 1, axis=1)),
+                axis=1,
+            )
+        return self._line_counts
+
+    def threats(self, player: int) -> np.ndarray:
+        """Get the winning-cell mask of a player.
+
+        A cell is a threat when it is empty and a piece of the player there would complete
+        a line, whether or not the cell can be played yet.
+
+        Args:
+            player (int): The player number.
+
+        Returns:
+            np.ndarray: A boolean array of shape (rows, cols), True at the player's threats.
+        """
+        counts = self.line_counts()
+        open_lines = (counts[:, player] == self.win_length - 1) & (counts[:, player ^ 1] == 0)
+        mask = np.zeros(self.rows * self.cols, dtype=bool)
+        mask[self.lines()[open_lines].ravel()] = True
+        mask &= self.board.ravel() == 2
+        return mask.reshape(self.rows, self.cols)
+
+    def winning_moves(self, player: int) -> list:
+        """Get the columns where the player wins with the next piece.
+
+        Args:
+            player (int): The player number.
+
+        Returns:
+            list: The valid columns whose next open cell is a threat of the player.
+        """
+        mask = self.threats(player)
+        return [c for c in self.valid_moves() if mask[self.get_next_open_row(c), c]]
+
+    def losing_moves(self, player: int) -> list:
+        """Get the columns where a piece of the player lets the opponent win on top of it.
+
+        A column is listed even if the move itself wins; check `winning_moves` first.
+
+        Args:
+            player (int): The player number.
+
+        Returns:
+            list: The valid columns whose cell above the next open cell is a threat of the
+                opponent.
+        """
+        mask = self.threats(player ^ 1)
+        moves = []
+        for c in self.valid_moves():
+            row = self.get_next_open_row(c)
+            if row > 0 and mask[row - 1, c]:
+                moves.append(c)
+        return moves
 
     def get_board(self):
         """Get the board.
@@ -80,7 +317,14 @@ class Board:
         """
         if self.rows < row or self.cols < col or value not in self.values:
             raise ValueError
+        previous = self.board[row, col]
         self.board[row, col] = value
+        if self._line_counts is not None:
+            through = cell_lines(self.rows, self.cols, self.win_length)[row * self.cols + col]
+            if previous != 2:
+                self._line_counts[through, previous] -= 1
+            if value != 2:
+                self._line_counts[through, value] += 1
 
     def print_board(self):
         """Print the current state of the Connect Four board.
@@ -89,7 +333,7 @@ class Board:
         print(np.flip(self.board, 0))
 
     def final_move(self, move: int) -> bool or int:
-        """Checks if the given move forms a winning streak (four consecutive moves)
+        """Checks if the given move forms a winning streak (`win_length` consecutive moves)
         on the provided board, considering horizontal, vertical, and diagonal directions.
 
         Args:
@@ -99,32 +343,11 @@ class Board:
             bool: True if a winning streak is found, False otherwise.
             int: 3 if the entire first row is filled (special case).
         """
-        # Check horizontal streaks
-        for r in range(self.rows):
-            for c in range(self.cols - 3):
-                if np.all(self.board[r, c : c + 4] == move):
-                    return True
-
-        # Check vertical streaks
-        for r in range(self.rows - 3):
-            for c in range(self.cols):
-                if np.all(self.board[r : r + 4, c] == move):
-                    return True
-
-        # Check diagonal streaks (bottom-left to top-right)
-        for r in range(self.rows - 3):
-            for c in range(self.cols - 3):
-                if all(self.board[r + i, c + i] == move for i in range(4)):
-                    return True
-
-        # Check diagonal streaks (top-left to bottom-right)
-        for r in range(3, self.rows):
-            for c in range(self.cols - 3):
-                if all(self.board[r - i, c + i] == move for i in range(4)):
-                    return True
+        if np.any(np.all(self.board.ravel()[self.lines()] == move, axis=1)):
+            return True
 
         # Check if the board is full (special case)
-        if np.all(self.board[0] != 0):
+        if np.all(self.board[0] != 2):
             return 3
 
         return False
@@ -138,7 +361,7 @@ class Board:
         Returns:
             bool: True if the move is valid, False otherwise.
         """
-        return self.board[0, col] == 0
+        return self.board[0, col] == 2
 
     def valid_moves(self) -> list:
         """Get a list of valid moves by checking which columns have an empty top row.
@@ -146,7 +369,7 @@ class Board:
         Returns:
             list: A list of valid column indices.
         """
-        return [c for c in range(self.cols) if self.board[0, c] == 0]
+        return [c for c in range(self.cols) if self.board[0, c] == 2]
 
     def get_next_open_row(self, col: int) -> int:
         """Find the next open row in the specified column.
@@ -158,7 +381,7 @@ class Board:
             int: The index of the next open row, or -1 if the column is full.
         """
         for r in range(self.rows - 1, -1, -1):
-            if self.board[r, col] == 0:
+            if self.board[r, col] == 2:
                 return r
         return -1
 
@@ -169,47 +392,11 @@ class Board:
         Returns:
             int: The player number of the winner (1 for player 1, 0 for player 2, 2 for no winner).
         """
-
-        def check_direction(row, col, dr, dc):
-            """
-            Check if there are four consecutive cells in the given direction.
-
-            Parameters:
-                row (int): The row index of the starting cell.
-                col (int): The column index of the starting cell.
-                dr (int): The row increment for the direction.
-                dc (int): The column increment for the direction.
-
-            Returns:
-                int: The player number of the player who has four consecutive cells in
-                     the given direction
-                     (1 for player 1, 0 for player 2, None for no winner).
-            """
-            player = self.board[row, col]
-            if player == 2:
-                return None
-            for i in range(1, 4):
-                if self.board[row + i * dr, col + i * dc] != player:
-                    return None
-            return player
-
-        for r in range(self.rows):
-            for c in range(self.cols):
-                if c <= self.cols - 4:
-                    result = check_direction(r, c, 0, 1)  # Horizontal
-                    if result is not None:
-                        return result
-                if r <= self.rows - 4:
-                    result = check_direction(r, c, 1, 0)  # Vertical
-                    if result is not None:
-                        return result
-                if c <= self.cols - 4 and r <= self.rows - 4:
-                    result = check_direction(r, c, 1, 1)  # Diagonal down-right
-                    if result is not None:
-                        return result
-                if c <= self.cols - 4 and r >= 3:
-                    result = check_direction(r, c, -1, 1)  # Diagonal up-right
-                    if result is not None:
-                        return result
-
+        if self._line_counts is not None:
+            won = np.flatnonzero(self._line_counts.ravel() == self.win_length)
+            return won[0] % 2 if len(won) else 2
+        cells = self.board.ravel()[self.lines()]
+        won = np.all(cells == cells[:, :1], axis=1) & (cells[:, 0] != 2)
+        if np.any(won):
+            return cells[np.argmax(won), 0]
         return 2
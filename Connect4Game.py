@@ -1,11 +1,13 @@
+import os
 import sys
 import math
-import copy
-import random
+import threading
 
+import numpy as np
 import pygame as pygame
 
 from Board import Board
+from Engine import human_player, mcts_n
 from MCTSTreeNode import MCTSTreeNode
 
 
@@ -13,98 +15,22 @@ BLUE = (0, 0, 255)
 BLACK = (0, 0, 0)
 RED = (255, 0, 0)
 YELLOW = (255, 255, 0)
+# Colour of the circle drawn for each cell value (player 0, player 1, empty)
+PIECE_COLORS = (YELLOW, RED, BLACK)
 # Constants
 Rows = 6
 Cols = 5
-
-
-def human_player(current_node, board, turn, level, col):
-    """
-    Simulates a human player's move in the game.
-
-    Parameters:
-    current_node (MCTSTreeNode): The current node in the game tree.
-    board (list): The current state of the game board represented as a 2D list.
-    turn (int): The player number (0 for player 2, 1 for player 1).
-    level (int): The level of the current node in the game tree (0 for player 2, 1 for player 1).
-    col (int): The column where the human player wants to place their piece.
-
-    Returns:
-    MCTSTreeNode: A new node representing the state of the game board after the human player's move.
-    """
-    board_cpy = copy.deepcopy(board)
-    row = 0
-    while row < Rows - 1 and board[row, col] == 2:
-        row += 1
-    if board[row, col] != 2:
-        row -= 1
-    board_cpy[row, col] = turn ^ 1
-    new_board = Board()
-    new_board.set_whole_board(board_cpy)
-    return MCTSTreeNode(new_board, current_node, turn ^ 1, level ^ 1)
-
-
-def mcts_n(parent_node, n):
-    """
-    Performs a Monte Carlo Tree Search (MCTS) for a specified number of iterations.
-
-    Parameters:
-    parent_node (MCTSTreeNode): The root node of the game tree.
-    n (int): The number of iterations for the MCTS.
-
-    Returns:
-    MCTSTreeNode: The selected child node from the parent node based on the MCTS algorithm.
-
-    The function performs MCTS by repeatedly selecting a child node based on the UCB1 formula,
-    expanding the game tree by selecting a random successor state, simulating a game from
-    the selected successor state, and updating the scores and visits of the nodes in the
-    game tree. The function continues this process until the specified number of iterations
-    is reached or a terminal state is reached.
-    """
-    initial_node = copy.deepcopy(parent_node)
-    while n > 0 and parent_node.state.check_win() == 2 and not parent_node.check_draw():
-        if len(parent_node.poss_child) and random.uniform(0, 1) >= 0:
-            parent_node = parent_node.expansion()
-            result = parent_node.simulation(parent_node.level)
-            parent_node.update(result)
-            parent_node = initial_node
-            n = n - 1
-        else:
-            parent_node = parent_node.selection()
-
-    lists = []
-    parent_node = initial_node
-    for child_node in parent_node.children:
-        if child_node.state.check_win() == parent_node.turn:
-            return child_node
-        if not lists:
-            lists.append(child_node)
-        else:
-            if lists[0].visits < child_node.visits:
-                lists = [child_node]
-            elif lists[0].visits == child_node.visits:
-                lists.append(child_node)
-    if lists:
-        child = lists[0]
-    else:
-        child = MCTSTreeNode(
-            random.choice(initial_node.state.GetNeighbourMoves(initial_node.level)),
-            initial_node,
-            initial_node.turn ^ 1,
-            initial_node.level ^ 1,
-        )
-    max_score = -10
-    for i in lists:
-        if i.score > max_score:
-            child = i
-            max_score = i.score
-    return child
+SQUARE_SIZE = 100
+FPS = 60
 
 
 def game_driver(screen, square_size, width, radius):
     """
     The main driver function for the game. Handles user input, game logic, and rendering.
 
+    The AI searches in a background thread while the event loop keeps running and polls
+    for its move once per frame, so the window stays responsive during the search.
+
     Parameters:
     screen (pygame.Surface): The surface object representing the game window.
     square_size (int): The size of each square on the game board.
@@ -124,25 +50,35 @@ def game_driver(screen, square_size, width, radius):
             if pygame_event.type == pygame.QUIT:
                 sys.exit()
 
-    def handle_mouse_motion(event_local, turn_local):
+    def handle_mouse_motion(event_local, turn_local, hovered_local):
         """
         Handles the MOUSE MOTION event, which occurs when the mouse is moved within the game window.
-        Draws a circle representing the current player's piece at the mouse's position.
+        Draws a circle representing the current player's piece above the hovered column; the
+        header is only repainted when the hovered column changes.
 
         Parameters:
         event_local (pygame.event.Event): The MOUSE MOTION event object.
         turn_local (int): The current player's turn (0 for player 2, 1 for player 1).
+        hovered_local (int): The column the piece is currently drawn above, or None.
+
+        Returns:
+        int: The column the piece is drawn above after the event.
         """
-        pygame.draw.rect(screen, BLACK, (0, 0, width, square_size))
-        px = event_local.pos[0]
+        col = event_local.pos[0] // square_size
+        if col == hovered_local:
+            return hovered_local
+        header = pygame.Rect(0, 0, width, square_size)
+        pygame.draw.rect(screen, BLACK, header)
         color = RED if turn_local == 0 else YELLOW
-        pygame.draw.circle(screen, color, (px, int(square_size / 2)), radius)
-        pygame.display.update()
+        center = (col * square_size + square_size // 2, square_size // 2)
+        pygame.draw.circle(screen, color, center, radius)
+        pygame.display.update(header)
+        return col
 
     def handle_mouse_button_down(event_local, current_node_local, turn_local):
         """
         Handles the MOUSE BUTTON DOWN event, which occurs when a mouse button is pressed.
-        Determines the column where the current player wants to place their piece and
+        Determines the column where the human player wants to place their piece and
         updates the game state accordingly.
 
         Parameters:
@@ -151,116 +87,162 @@ def game_driver(screen, square_size, width, radius):
         turn_local (int): The current player's turn (0 for player 2, 1 for player 1).
 
         Returns:
-        MCTSTreeNode: The new node representing the state of the game board after the current player's move.
+        MCTSTreeNode: The new node representing the state of the game board after the human player's move,
+            or None if the column is full.
         """
         px = event_local.pos[0]
         col = int(math.floor(px / square_size))
-        if turn_local == 0:
-            return human_player(
-                current_node_local,
-                current_node_local.state.get_board(),
-                turn_local,
-                current_node_local.level,
-                col,
-            )
-        else:
-            return mcts_n(current_node, 200)
-
-    def draw_current_board(current_state_local):
+        if not current_node_local.state.valid_move(col):
+            return None
+        return human_player(
+            current_node_local,
+            current_node_local.state.get_board(),
+            turn_local,
+            current_node_local.level,
+            col,
+        )
+
+    def start_ai_search(current_node_local, result_local):
         """
-        Draws the current state of the game board on the screen.
+        Starts the AI's search in a background thread.
 
         Parameters:
-        current_state_local (Board): The current state of the game board.
+        current_node_local (MCTSTreeNode): The node to search from.
+        result_local (list): The list the chosen node is appended to when the search ends.
+
+        Returns:
+        threading.Thread: The running search thread.
         """
-        draw_board(current_state_local.get_board(), screen, square_size, radius)
+        search = threading.Thread(
+            target=lambda: result_local.append(mcts_n(current_node_local, 200)),
+            daemon=True,
+        )
+        search.start()
+        return search
 
     turn = 0
     board = Board()
     current_node = MCTSTreeNode(board, None, 0, 0)
     current_state = current_node.state
+    drawn = draw_current_board(current_state, None, screen, square_size, radius)
+    hovered = None
+    ai_search = None
+    ai_result = []
+    clock = pygame.time.Clock()
 
     while current_state.check_win() == 2 and not current_node.check_draw():
         handle_quit_event()
 
         for event in pygame.event.get():
             if event.type == pygame.MOUSEMOTION:
-                handle_mouse_motion(event, turn)
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                current_node = handle_mouse_button_down(event, current_node, turn)
+                hovered = handle_mouse_motion(event, turn, hovered)
+            if event.type == pygame.MOUSEBUTTONDOWN and ai_search is None:
+                human_node = handle_mouse_button_down(event, current_node, turn)
+                if human_node is None:
+                    continue
+                current_node = human_node
                 current_state = current_node.state
                 turn = turn ^ 1
-                draw_current_board(current_state)
+                hovered = None
+                drawn = draw_current_board(
+                    current_state, drawn, screen, square_size, radius
+                )
+                if current_state.check_win() == 2 and not current_node.check_draw():
+                    ai_search = start_ai_search(current_node, ai_result)
+
+        if ai_search is not None and not ai_search.is_alive():
+            current_node = ai_result.pop()
+            current_state = current_node.state
+            turn = turn ^ 1
+            hovered = None
+            ai_search = None
+            drawn = draw_current_board(current_state, drawn, screen, square_size, radius)
+
+        clock.tick(FPS)
 
     pygame.time.wait(3000)
 
 
-def draw_board(board, screen, SQ_SIZE, RADIUS):
+def draw_current_board(current_state, drawn, screen, square_size, radius):
     """
-    Draws the current state of the game board on the screen.
+    Draws the cells of the game board that changed since the last frame.
+
+    Parameters:
+    current_state (Board): The current state of the game board.
+    drawn (numpy.ndarray): The board as drawn in the last frame, or None to draw every cell.
+    screen (pygame.Surface): The surface object representing the game window.
+    square_size (int): The size of each square on the game board.
+    radius (int): The radius of the circles representing the game pieces.
+
+    Returns:
+    numpy.ndarray: A copy of the board as drawn now, to pass in for the next frame.
+    """
+    board = current_state.get_board()
+    draw_board(board, screen, square_size, radius, drawn)
+    return board.copy()
+
+
+def draw_board(board, screen, SQ_SIZE, RADIUS, previous=None):
+    """
+    Draws the state of the game board on the screen.
+
+    Only the cells that differ from the previous frame are redrawn, and only their
+    rectangles are pushed to the display.
 
     Parameters:
     board (numpy.ndarray): The current state of the game board represented as a 2D numpy array.
     screen (pygame.Surface): The surface object representing the game window.
     SQ_SIZE (int): The size of each square on the game board.
     RADIUS (int): The radius of the circles representing the game pieces.
+    previous (numpy.ndarray, optional): The board as drawn in the last frame; every cell is
+        drawn if omitted.
 
     Returns:
-    None
+    list: The pygame.Rect of every redrawn cell.
     """
-    for c in range(Cols):
-        for r in range(Rows):
-            # Draw a blue rectangle to represent an empty cell
-            pygame.draw.rect(
-                screen, BLUE, (c * SQ_SIZE, r * SQ_SIZE + SQ_SIZE, SQ_SIZE, SQ_SIZE)
-            )
-            # Draw a black circle to represent a piece of player 2
-            if board[r, c] == 2:
-                pygame.draw.circle(
-                    screen,
-                    BLACK,
-                    (
-                        int(c * SQ_SIZE + SQ_SIZE / 2),
-                        int(r * SQ_SIZE + SQ_SIZE + SQ_SIZE / 2),
-                    ),
-                    RADIUS,
-                )
-            # Draw a red circle to represent a piece of player 1
-            if board[r, c] == 1:
-                pygame.draw.circle(
-                    screen,
-                    RED,
-                    (
-                        int(c * SQ_SIZE + SQ_SIZE / 2),
-                        int(r * SQ_SIZE + SQ_SIZE + SQ_SIZE / 2),
-                    ),
-                    RADIUS,
-                )
-            # Draw a yellow circle to represent a piece of player 0
-            if board[r, c] == 0:
-                pygame.draw.circle(
-                    screen,
-                    YELLOW,
-                    (
-                        int(c * SQ_SIZE + SQ_SIZE / 2),
-                        int(r * SQ_SIZE + SQ_SIZE + SQ_SIZE / 2),
-                    ),
-                    RADIUS,
-                )
+    if previous is None:
+        cells = np.argwhere(np.ones_like(board, dtype=bool))
+    else:
+        cells = np.argwhere(board != previous)
+    dirty = []
+    for r, c in cells:
+        cell = pygame.Rect(c * SQ_SIZE, r * SQ_SIZE + SQ_SIZE, SQ_SIZE, SQ_SIZE)
+        # Draw a blue square with a circle coloured by the piece in it (black if empty)
+        pygame.draw.rect(screen, BLUE, cell)
+        pygame.draw.circle(screen, PIECE_COLORS[board[r, c]], cell.center, RADIUS)
+        dirty.append(cell)
     # Update the display to show the changes
-    pygame.display.update()
+    if dirty:
+        pygame.display.update(dirty)
+    return dirty
 
 
-def main():
+def init_display(headless=False):
+    """
+    Initializes pygame and opens the game window.
+
+    Parameters:
+    headless (bool): Render to an off-screen surface through SDL's dummy video driver,
+        e.g. to benchmark rendering without a display.
+
+    Returns:
+    tuple: The screen surface, the window width and the piece radius.
+    """
+    if headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
     pygame.init()
-    ASSIZE = 100
-    width = Cols * ASSIZE
-    height = (Rows + 1) * ASSIZE
+    width = Cols * SQUARE_SIZE
+    height = (Rows + 1) * SQUARE_SIZE
     size = (width, height)
-    RADIUS = int(ASSIZE / 2 - 3)
+    radius = int(SQUARE_SIZE / 2 - 3)
     screen = pygame.display.set_mode(size)
     pygame.display.update()
-    game_driver(screen, ASSIZE, width, RADIUS)
+    return screen, width, radius
+
+
+def main():
+    screen, width, radius = init_display()
+    game_driver(screen, SQUARE_SIZE, width, radius)
 
 
 if __name__ == "__main__":
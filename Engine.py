@@ -0,0 +1,316 @@
+import copy
+import threading
+import time
+
+import numpy as np
+
+from Board import Board, cell_lines, winning_lines
+from MCTSTreeNode import MCTSTreeNode
+
+# Board sizes (rows, cols, win_length) whose line tables are built by `preload`
+PRELOAD_SIZES = ((6, 5, 4), (6, 7, 4))
+
+
+class SearchStats:
+    """
+    A class counting how many move decisions skipped the search because the move was forced.
+
+    The latency saved is estimated as the mean time of a full search times the number of
+    skipped searches, less the time spent finding the forced moves. It is safe to share
+    between threads.
+
+    Methods:
+        record(skipped, seconds): Counts one move decision.
+        snapshot(): Returns the counters and the estimated latency saved.
+        reset(): Clears the counters.
+    """
+
+    def __init__(self):
+        """Initialize empty counters."""
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Clear the counters."""
+        with self._lock:
+            self._searched = 0
+            self._skipped = 0
+            self._search_seconds = 0.0
+            self._skipped_seconds = 0.0
+
+    def record(self, skipped: bool, seconds: float):
+        """Count one move decision.
+
+        Args:
+            skipped (bool): True if a forced move was played without searching.
+            seconds (float): The time the decision took.
+        """
+        with self._lock:
+            if skipped:
+                self._skipped += 1
+                self._skipped_seconds += seconds
+            else:
+                self._searched += 1
+                self._search_seconds += seconds
+
+    def snapshot(self) -> dict:
+        """Get the counters.
+
+        Returns:
+            dict: The number of searched and skipped decisions, the share skipped, the mean
+                search time and the estimated latency saved, both in milliseconds.
+        """
+        with self._lock:
+            decisions = self._searched + self._skipped
+            mean_search = self._search_seconds / self._searched if self._searched else 0.0
+            saved = max(self._skipped * mean_search - self._skipped_seconds, 0.0)
+            return {
+                "searched": self._searched,
+                "skipped": self._skipped,
+                "skip_rate": self._skipped / decisions if decisions else 0.0,
+                "mean_search_ms": mean_search * 1e3,
+                "latency_saved_ms": saved * 1e3,
+            }
+
+
+# Counts the move decisions made by every `mcts_n` call in the process
+search_stats = SearchStats()
+
+
+def human_player(current_node, board, turn, level, col):
+    """
+    Simulates a human player's move in the game.
+
+    Parameters:
+    current_node (MCTSTreeNode): The current node in the game tree.
+    board (list): The current state of the game board represented as a 2D list.
+    turn (int): The player number (0 for player 2, 1 for player 1).
+    level (int): The level of the current node in the game tree (0 for player 2, 1 for player 1).
+    col (int): The column where the human player wants to place their piece.
+
+    Returns:
+    MCTSTreeNode: A new node representing the state of the game board after the human player's move.
+    """
+    board_cpy = copy.deepcopy(board)
+    row = 0
+    while row < board.shape[0] - 1 and board[row, col] == 2:
+        row += 1
+    if board[row, col] != 2:
+        row -= 1
+    board_cpy[row, col] = turn ^ 1
+    new_board = Board(win_length=current_node.state.win_length)
+    new_board.set_whole_board(board_cpy)
+    return MCTSTreeNode(new_board, current_node, turn ^ 1, level ^ 1)
+
+
+def mcts_search(root_node, n, should_stop=None, prior=None, rng=None):
+    """
+    Runs up to n Monte Carlo Tree Search iterations in place on the given tree.
+
+    Parameters:
+    root_node (MCTSTreeNode): The root node of the game tree; its statistics and those of
+        its descendants are updated in place.
+    n (int): The maximum number of iterations to run.
+    should_stop (callable, optional): Polled before every iteration; the search returns
+        early once it returns True.
+    prior (RolloutPrior, optional): Learned move priors used by expansion and rollouts
+        instead of uniform move choice.
+    rng (np.random.Generator, optional): The random stream every random choice of the
+        search draws from; a freshly seeded one is used if omitted.
+
+    Returns:
+    int: The number of iterations run.
+
+    Each iteration walks down from the root with the UCB1 formula until it reaches a node
+    with unexpanded successors, expands one of them, simulates a game from it and backs the
+    result up the tree. A walk that ends on a finished game backs up that game's result.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    done = 0
+    while done < n and root_node.state.check_win() == 2 and not root_node.check_draw():
+        if should_stop is not None and should_stop():
+            break
+        node = root_node
+        while node.state.check_win() == 2 and not len(node.poss_child) and node.children:
+            node = node.selection()
+        result = node.state.check_win()
+        if result == 2 and len(node.poss_child):
+            node = node.expansion(prior, rng)
+            result = node.simulation(node.level, prior, rng)
+        node.update(result)
+        done += 1
+    return done
+
+
+def forced_move(board, player):
+    """
+    Finds a move the player has to make, so it can be played without searching.
+
+    Parameters:
+    board (Board): The board to move on.
+    player (int): The player to move.
+
+    Returns:
+    int: The column of a winning move, else of a move blocking an opponent's win, else of
+        the only move that does not let the opponent win on top of it; None if no move is
+        forced.
+    """
+    wins = board.winning_moves(player)
+    if wins:
+        return wins[0]
+    blocks = board.winning_moves(player ^ 1)
+    if blocks:
+        return blocks[0]
+    losing = board.losing_moves(player)
+    safe = [c for c in board.valid_moves() if c not in losing]
+    if len(safe) == 1:
+        return safe[0]
+    return None
+
+
+def random_move(parent_node, rng=None):
+    """
+    Picks a uniformly random move without searching.
+
+    Every open column is equally likely; unlike the successors the search generates, mirrored
+    and losing moves are not pruned.
+
+    Parameters:
+    parent_node (MCTSTreeNode): The node to move from.
+    rng (np.random.Generator, optional): The random stream; a freshly seeded one if omitted.
+
+    Returns:
+    MCTSTreeNode: A new child node of the parent node for a random successor state.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    cols = parent_node.state.valid_moves()
+    col = cols[rng.integers(len(cols))]
+    board = copy.deepcopy(parent_node.state)
+    board.set_board(board.get_next_open_row(col), col, parent_node.level ^ 1)
+    return MCTSTreeNode(board, parent_node, parent_node.turn ^ 1, parent_node.level ^ 1)
+
+
+def mirror_tree(node):
+    """
+    Reflects a searched subtree left to right in place.
+
+    Parameters:
+    node (MCTSTreeNode): The root of the subtree; the states and unexpanded successors of it
+        and all its descendants are replaced by their mirror images.
+
+    Returns:
+    MCTSTreeNode: The same node.
+    """
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        current.state = current.state.mirrored()
+        current.poss_child = np.array([board.mirrored() for board in current.poss_child])
+        stack.extend(current.children)
+    return node
+
+
+def mcts_n(parent_node, n, time_limit=None, prior=None, rng=None):
+    """
+    Performs a Monte Carlo Tree Search (MCTS) for a specified number of iterations.
+
+    Parameters:
+    parent_node (MCTSTreeNode): The root node of the game tree.
+    n (int): The number of iterations for the MCTS.
+    time_limit (float, optional): The number of seconds after which the search stops even
+        if fewer than n iterations have run.
+    prior (RolloutPrior, optional): Learned move priors for expansion and rollouts.
+    rng (np.random.Generator, optional): The random stream of the search. Searches given
+        identically seeded streams make identical choices; a freshly seeded one is used
+        if omitted.
+
+    Returns:
+    MCTSTreeNode: The selected child node from the parent node based on the MCTS algorithm.
+
+    The function performs MCTS by repeatedly selecting a child node based on the UCB1 formula,
+    expanding the game tree by selecting a random successor state, simulating a game from
+    the selected successor state, and updating the scores and visits of the nodes in the
+    game tree. The function continues this process until the specified number of iterations
+    is reached or a terminal state is reached.
+
+    A fresh root that is not in canonical orientation is searched as its mirror image and the
+    chosen move, with the subtree searched below it, is reflected back, so mirrored positions
+    share one search.
+
+    A forced move (see `forced_move`) is played at once without searching; `search_stats`
+    counts how often that happens.
+    """
+    if not parent_node.children and not parent_node.state.is_canonical():
+        mirrored_root = MCTSTreeNode(
+            parent_node.state.mirrored(),
+            parent_node.parent,
+            parent_node.turn,
+            parent_node.level,
+        )
+        child = mirror_tree(mcts_n(mirrored_root, n, time_limit, prior, rng))
+        child.parent = parent_node
+        return child
+
+    started = time.monotonic()
+    col = forced_move(parent_node.state, parent_node.level ^ 1)
+    if col is not None:
+        board = copy.deepcopy(parent_node.state)
+        board.set_board(board.get_next_open_row(col), col, parent_node.level ^ 1)
+        search_stats.record(True, time.monotonic() - started)
+        return MCTSTreeNode(board, parent_node, parent_node.turn ^ 1, parent_node.level ^ 1)
+
+    deadline = None if time_limit is None else time.monotonic() + time_limit
+
+    def should_stop():
+        return deadline is not None and time.monotonic() >= deadline
+
+    if rng is None:
+        rng = np.random.default_rng()
+    initial_node = copy.deepcopy(parent_node)
+    mcts_search(initial_node, n, should_stop, prior, rng)
+    search_stats.record(False, time.monotonic() - started)
+
+    lists = []
+    parent_node = initial_node
+    for child_node in parent_node.children:
+        if child_node.state.check_win() == parent_node.turn:
+            return child_node
+        if not lists:
+            lists.append(child_node)
+        else:
+            if lists[0].visits < child_node.visits:
+                lists = [child_node]
+            elif lists[0].visits == child_node.visits:
+                lists.append(child_node)
+    if lists:
+        child = lists[0]
+    else:
+        child = random_move(initial_node, rng)
+    max_score = -10
+    for i in lists:
+        if i.score > max_score:
+            child = i
+            max_score = i.score
+    return child
+
+
+def preload(sizes=PRELOAD_SIZES):
+    """
+    Builds the engine's shared tables ahead of time.
+
+    Call this in the server's master process before workers are forked (e.g. at import time
+    with gunicorn --preload) so every worker shares the tables' pages copy-on-write instead
+    of building its own copy on the first request.
+
+    Parameters:
+    sizes (iterable): The (rows, cols, win_length) triples whose winning lines and
+        cell-to-line maps to build.
+
+    Returns:
+    None
+    """
+    for rows, cols, win_length in sizes:
+        winning_lines(rows, cols, win_length)
+        cell_lines(rows, cols, win_length)
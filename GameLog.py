@@ -0,0 +1,162 @@
+import argparse
+import json
+import os
+import threading
+import time
+
+from GameRecord import GameRecord
+
+
+class GameLog:
+    """
+    A class to append completed games to a JSONL log.
+
+    Each line holds one game: its ID, board size, win length, moves, winner and the time it
+    ended. Lines are written through to the OS on every append, but fsync is batched: it runs
+    once `fsync_every` games have accumulated, and a background thread syncs pending games
+    every `fsync_interval` seconds, so a crash can lose at most one batch.
+
+    Attributes:
+        path (str): The path of the log file.
+        fsync_every (int): The number of appended games that triggers an fsync.
+        fsync_interval (float): The number of seconds after which pending games are fsynced.
+
+    Methods:
+        append(game_id, record, **extra): Appends a completed game to the log.
+        sync(): Forces pending games to disk.
+        close(): Syncs and closes the log.
+    """
+
+    def __init__(self, path: str, fsync_every: int = 32, fsync_interval: float = 5.0):
+        """Open a game log for appending.
+
+        Args:
+            path (str): The path of the log file; it is created if missing.
+            fsync_every (int, optional): The number of appended games that triggers an fsync.
+                Defaults to 32.
+            fsync_interval (float, optional): The number of seconds after which pending games
+                are fsynced. Defaults to 5.0.
+        """
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._closed = threading.Event()
+        self._syncer = threading.Thread(target=self._sync_periodically, daemon=True)
+        self._syncer.start()
+
+    def append(self, game_id: str, record: GameRecord, **extra):
+        """Append a completed game to the log.
+
+        Args:
+            game_id (str): The ID of the game.
+            record (GameRecord): The moves of the game.
+            **extra: Additional JSON-serializable fields to store with the game.
+        """
+        entry = {
+            "id": game_id,
+            **record.to_dict(),
+            "winner": record.winner(),
+            "ended": round(time.time(), 3),
+            **extra,
+        }
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self._pending += 1
+            if (
+                self._pending >= self.fsync_every
+                or time.monotonic() - self._last_sync >= self.fsync_interval
+            ):
+                self._sync()
+
+    def sync(self):
+        """Force pending games to disk."""
+        with self._lock:
+            self._sync()
+
+    def close(self):
+        """Sync and close the log."""
+        self._closed.set()
+        self._syncer.join()
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+                self._file.close()
+
+    def _sync_periodically(self):
+        """Sync pending games every `fsync_interval` seconds until the log is closed."""
+        while not self._closed.wait(self.fsync_interval):
+            with self._lock:
+                if self._pending:
+                    self._sync()
+
+    def _sync(self):
+        """Fsync the log; the caller must hold the lock."""
+        if self._pending:
+            os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+
+def iter_games(path: str):
+    """
+    Iterates over the games stored in a log.
+
+    Parameters:
+    path (str): The path of the log file.
+
+    Yields:
+    tuple: The raw log entry (dict) and the game's GameRecord.
+    """
+    with open(path, encoding="utf-8") as log_file:
+        for line in log_file:
+            if line.strip():
+                entry = json.loads(line)
+                yield entry, GameRecord.from_dict(entry)
+
+
+def replay(path: str, game_id: str, ply: int = None):
+    """
+    Rebuilds a position of a logged game.
+
+    Parameters:
+    path (str): The path of the log file.
+    game_id (str): The ID of the game.
+    ply (int, optional): The number of moves to replay; defaults to the whole game.
+
+    Returns:
+    Board: The board after ply moves, or None if the game is not in the log.
+    """
+    for entry, record in iter_games(path):
+        if entry["id"] == game_id:
+            return record.board_at(len(record.moves) if ply is None else ply)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay games from a game log.")
+    parser.add_argument("log", help="Path of the JSONL game log.")
+    parser.add_argument("game_id", nargs="?", help="Game to replay; lists games if omitted.")
+    parser.add_argument("--ply", type=int, help="Number of moves to replay.")
+    args = parser.parse_args()
+
+    if args.game_id is None:
+        for entry, record in iter_games(args.log):
+            print(
+                f"{entry['id']} {record.rows}x{record.cols} K={record.win_length} "
+                f"moves={len(record.moves)} winner={entry['winner']}"
+            )
+        return
+    board = replay(args.log, args.game_id, args.ply)
+    if board is None:
+        raise SystemExit(f"Game {args.game_id} not found in {args.log}.")
+    print(board.get_board())
+
+
+if __name__ == "__main__":
+    main()
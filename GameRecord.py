@@ -0,0 +1,157 @@
+import numpy as np
+
+from Board import Board
+
+
+class GameRecord:
+    """
+    A class to represent a game as an append-only list of moves.
+
+    The board is derived from the moves and cached, so it only has to be rebuilt when an
+    earlier position is asked for. Player 0 (the human) makes the even plies and player 1
+    (the AI) the odd ones.
+
+    Attributes:
+        rows (int): The number of rows in the board.
+        cols (int): The number of columns in the board.
+        win_length (int): The number of pieces in a row needed to win.
+        moves (list): The column of every move played so far, in order.
+
+    Methods:
+        play(col): Appends a move and returns the row it landed in.
+        play_board(board_state): Appends the move that leads to the given board.
+        board(): Returns the cached board after the last move.
+        board_at(ply): Rebuilds the board after the first ply moves.
+        turn(): Returns the player to move.
+        winner(): Returns the winner, or 2 if there is none yet.
+        is_over(): Checks if the game has been won or drawn.
+        to_dict(): Returns the record as a JSON-serializable dict.
+        from_dict(data): Builds a record from a dict produced by `to_dict`.
+    """
+
+    def __init__(self, rows: int, cols: int, win_length: int = 4, moves=None):
+        """Initialize a new game record.
+
+        Args:
+            rows (int): The number of rows in the board.
+            cols (int): The number of columns in the board.
+            win_length (int, optional): The number of pieces in a row needed to win. Defaults to 4.
+            moves (list, optional): The columns of the moves already played. Defaults to none.
+        """
+        self.rows = rows
+        self.cols = cols
+        self.win_length = win_length
+        self.moves = list(moves or ())
+        self._board = self.board_at(len(self.moves))
+
+    def play(self, col: int) -> int:
+        """Append a move for the player to move.
+
+        Args:
+            col (int): The column to drop the piece in.
+
+        Raises:
+            ValueError: If the column is out of bounds or full.
+
+        Returns:
+            int: The row the piece landed in.
+        """
+        if not 0 <= col < self.cols:
+            raise ValueError(f"Column {col} is out of bounds.")
+        row = self._board.get_next_open_row(col)
+        if row < 0:
+            raise ValueError(f"Column {col} is full.")
+        self._board.set_board(row, col, self.turn())
+        self.moves.append(col)
+        return row
+
+    def play_board(self, board_state) -> int:
+        """Append the move that turns the current board into the given one.
+
+        Args:
+            board_state (Board): The board one move after the current one, e.g. the state
+                of the node picked by the search.
+
+        Returns:
+            int: The column of the move.
+        """
+        changed = np.argwhere(board_state.get_board() != self._board.get_board())
+        col = int(changed[0][1])
+        self.play(col)
+        return col
+
+    def board(self):
+        """Get the board after the last move.
+
+        The returned board is owned by the record; copy it before changing it.
+
+        Returns:
+            Board: The cached current board.
+        """
+        return self._board
+
+    def board_at(self, ply: int):
+        """Rebuild the board after the first ply moves.
+
+        Args:
+            ply (int): The number of moves to replay.
+
+        Returns:
+            Board: A new board holding the position after ply moves.
+        """
+        board = Board(self.rows, self.cols, self.win_length)
+        heights = np.full(self.cols, self.rows - 1)
+        cells = board.get_board()
+        for i, col in enumerate(self.moves[:ply]):
+            cells[heights[col], col] = i % 2
+            heights[col] -= 1
+        return board
+
+    def turn(self) -> int:
+        """Get the player to move.
+
+        Returns:
+            int: 0 if the human is to move, 1 if the AI is.
+        """
+        return len(self.moves) % 2
+
+    def winner(self) -> int:
+        """Get the winner of the game.
+
+        Returns:
+            int: The player number of the winner, or 2 for no winner.
+        """
+        return int(self._board.check_win())
+
+    def is_over(self) -> bool:
+        """Check if the game has been won or the board is full.
+
+        Returns:
+            bool: True if the game is over, False otherwise.
+        """
+        return self.winner() != 2 or len(self.moves) == self.rows * self.cols
+
+    def to_dict(self) -> dict:
+        """Get the record as a JSON-serializable dict.
+
+        Returns:
+            dict: The board size, win length and moves of the game.
+        """
+        return {
+            "rows": self.rows,
+            "cols": self.cols,
+            "win_length": self.win_length,
+            "moves": list(self.moves),
+        }
+
+    @staticmethod
+    def from_dict(data: dict):
+        """Build a record from a dict produced by `to_dict`.
+
+        Args:
+            data (dict): The board size, win length and moves of the game.
+
+        Returns:
+            GameRecord: The rebuilt record.
+        """
+        return GameRecord(data["rows"], data["cols"], data["win_length"], data["moves"])
@@ -1,4 +1,3 @@
-import random
 import math
 import copy
 
@@ -41,9 +40,9 @@ class MCTSTreeNode:
         Generate all possible successor states from the current state.
     selection(self)
         Select the best child node based on the UCB1 formula.
-    expansion(self)
+    expansion(self, prior, rng)
         Expands the game tree by selecting a random successor state.
-    simulation(self, level)
+    simulation(self, level, prior, rng)
         Simulates a game from the current board state.
     update(self, result)
         Update the scores and visits based on the simulation result.
@@ -123,9 +122,25 @@ class MCTSTreeNode:
         Returns:
         np.ndarray: An array of successor states (2D arrays) representing the possible moves
         from the given parent state.
+
+        In a left-right symmetric position the moves in the right half mirror those in the
+        left half, so only columns up to and including the middle one are generated.
+
+        Moves that let the opponent win on top of them are left out unless they win at once
+        or every move does so.
         """
         child_nodes = []
-        for i in range(self.state.shapes[1]):
+        n_cols = self.state.shapes[1]
+        if self.state.is_symmetric():
+            n_cols = (n_cols + 1) // 2
+        losing = set(self.state.losing_moves(level ^ 1))
+        if losing:
+            losing -= set(self.state.winning_moves(level ^ 1))
+            if len(losing) == len(self.state.valid_moves()):
+                losing = set()
+        for i in range(n_cols):
+            if i in losing:
+                continue
             board_cpy = copy.deepcopy(self.state)
             if board_cpy.get_board()[0, i] == 2:
                 for j in range(self.state.shapes[0]):
@@ -155,11 +170,17 @@ class MCTSTreeNode:
                 best_child = self.children[i]
         return best_child
 
-    def expansion(self):
+    def expansion(self, prior=None, rng=None):
         """
         Expands the game tree by selecting a random successor state from the parent node's
         possible child states.
 
+        Parameters:
+        prior (RolloutPrior, optional): Learned move priors; when given, successors are
+        picked in proportion to their prior weight instead of uniformly.
+        rng (np.random.Generator, optional): The search's random stream; a freshly seeded
+        one is used if omitted.
+
         Returns:
         MCTSTreeNode: The newly created child node representing the selected successor state.
 
@@ -167,7 +188,17 @@ class MCTSTreeNode:
         This function also updates the parent node's list of possible child states by removing
         the selected successor state.
         """
-        next_node = random.choice(self.poss_child)
+        if rng is None:
+            rng = np.random.default_rng()
+        if prior is None:
+            next_node = self.poss_child[rng.integers(len(self.poss_child))]
+        else:
+            cols = [
+                int(np.argwhere(child.get_board() != self.state.get_board())[0][1])
+                for child in self.poss_child
+            ]
+            col = prior.choose(self.state, cols, self.level ^ 1, rng.random())
+            next_node = self.poss_child[cols.index(col)]
         self.poss_child = np.delete(
             self.poss_child, np.where(self.poss_child == next_node), axis=0
         )
@@ -175,36 +206,44 @@ class MCTSTreeNode:
         self.children.append(child)
         return child
 
-    def simulation(self, level):
+    def simulation(self, level, prior=None, rng=None):
         """
         Simulates a game from the given board state and level.
 
         Parameters:
         level (int): The player number (0 for player 2, 1 for player 1).
+        prior (RolloutPrior, optional): Learned move priors; when given, moves are picked in
+        proportion to their prior weight instead of uniformly.
+        rng (np.random.Generator, optional): The search's random stream; a freshly seeded
+        one is used if omitted.
 
         Returns:
         int: The result of the simulation (1 for player 1 win, 0 for player 2 win, 2 for draw).
 
-        The function repeatedly selects a random successor state from the given parent state
-        and checks for win or draw conditions until a terminal state is reached.
-        """
-        board = self.state
-        original_board_state = board
-        while True:
-            moves = self.get_neighbour_moves(level)
-            if not moves.size:
-                self.state = original_board_state
-                return board.check_win()
-            self.state = random.choice(moves)
-            if (
-                (board.check_win() == 2 and self.check_draw())
-                or board.check_win() == 1
-                or board.check_win() == 0
-            ):
+        The function repeatedly drops a piece in a random open column of a copy of the
+        node's board and checks for win or draw conditions until a terminal state is reached.
+        The uniform draws for every remaining ply are taken from the stream in one call.
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        board = copy.deepcopy(self.state)
+        draws = rng.random(int(np.count_nonzero(board.get_board() == 2)))
+        result = board.check_win()
+        ply = 0
+        while result == 2:
+            cols = board.valid_moves()
+            if not cols:
                 break
-            level = level ^ 1
-        self.state = original_board_state
-        return board.check_win()
+            player = level ^ 1
+            if prior is None:
+                col = cols[int(draws[ply] * len(cols))]
+            else:
+                col = prior.choose(board, cols, player, draws[ply])
+            board.set_board(board.get_next_open_row(col), col, player)
+            result = board.check_win()
+            level = player
+            ply += 1
+        return result
 
     def update(self, result):
         """
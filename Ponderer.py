@@ -0,0 +1,153 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from Engine import mcts_search
+
+
+class Ponderer:
+    """
+    A class that keeps searching a game's retained tree while the human is thinking.
+
+    After the AI replies, the node of the position it left behind is handed to `start`.
+    A background worker keeps running MCTS iterations on that node, which spreads visits
+    over the human's likely replies. When the human's move arrives, `stop` cancels the
+    worker and returns the node so the subtree of the reply that was actually played can
+    seed the next search, together with the visits each reply had before pondering began.
+
+    Attributes:
+        max_workers (int): The maximum number of games pondering at the same time.
+        budget_seconds (float): The default CPU time one game may ponder between two moves.
+        chunk (int): The number of iterations run between checks for cancellation.
+
+    Methods:
+        start(game_id, node, prior, rng, budget_seconds): Starts pondering on a game's node.
+        stop(game_id): Cancels pondering on a game and returns its node and start visits.
+        foreground(): Context manager marking a foreground search; pondering pauses meanwhile.
+    """
+
+    def __init__(self, max_workers: int = 2, budget_seconds: float = 2.0, chunk: int = 5):
+        """
+        Initialize a new Ponderer.
+
+        Args:
+            max_workers (int, optional): The maximum number of games pondering at the same
+                time. Defaults to 2.
+            budget_seconds (float, optional): The CPU time one game may ponder between two
+                moves. Defaults to 2.0.
+            chunk (int, optional): The number of iterations run between checks for
+                cancellation. Defaults to 5.
+        """
+        self.max_workers = max_workers
+        self.budget_seconds = budget_seconds
+        self.chunk = chunk
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._foreground = 0
+        self._idle = threading.Condition()
+
+    def start(self, game_id, node, prior=None, rng=None, budget_seconds=None):
+        """
+        Start pondering on the given node in a background thread.
+
+        Any pondering already running for the game is cancelled first. Nothing is started
+        when all worker slots are taken.
+
+        Args:
+            game_id (str): The game the node belongs to.
+            node (MCTSTreeNode): The node to search; it is updated in place.
+            prior (RolloutPrior, optional): Learned move priors for the search.
+            rng (np.random.Generator, optional): The worker's own random stream; a freshly
+                seeded one is used if omitted.
+            budget_seconds (float, optional): The CPU time this game may ponder; defaults
+                to `budget_seconds`.
+
+        Returns:
+            bool: True if a worker was started, False otherwise.
+        """
+        self.stop(game_id)
+        if budget_seconds is None:
+            budget_seconds = self.budget_seconds
+        if not self._slots.acquire(blocking=False):
+            return False
+        stop_event = threading.Event()
+        worker = threading.Thread(
+            target=self._run,
+            args=(node, stop_event, prior, rng, budget_seconds),
+            daemon=True,
+        )
+        # Visits of each reply before pondering, so callers can tell what pondering added
+        start_visits = {
+            child.state.get_board().tobytes(): child.visits for child in node.children
+        }
+        with self._lock:
+            self._jobs[game_id] = (worker, stop_event, node, start_visits)
+        worker.start()
+        return True
+
+    def stop(self, game_id):
+        """
+        Cancel pondering on a game and wait for its worker to finish.
+
+        Args:
+            game_id (str): The game to stop pondering on.
+
+        Returns:
+            tuple: The pondered node, or None if the game was not pondering, and a dict
+                mapping the board bytes of each of the node's children when pondering
+                started to the child's visits at that time.
+        """
+        with self._lock:
+            job = self._jobs.pop(game_id, None)
+        if job is None:
+            return None, {}
+        worker, stop_event, node, start_visits = job
+        stop_event.set()
+        with self._idle:
+            self._idle.notify_all()
+        worker.join()
+        return node, start_visits
+
+    @contextmanager
+    def foreground(self):
+        """
+        Mark a foreground search as running; pondering workers pause until it finishes.
+        """
+        with self._idle:
+            self._foreground += 1
+        try:
+            yield
+        finally:
+            with self._idle:
+                self._foreground -= 1
+                self._idle.notify_all()
+
+    def _run(self, node, stop_event, prior, rng, budget_seconds):
+        """
+        Search the node in chunks until cancelled, out of budget or out of positions.
+
+        Args:
+            node (MCTSTreeNode): The node to search.
+            stop_event (threading.Event): Set to cancel the worker.
+            prior (RolloutPrior): Learned move priors for the search, or None.
+            rng (np.random.Generator): The worker's random stream, or None.
+            budget_seconds (float): The CPU time the worker may use.
+        """
+        try:
+            if rng is None:
+                rng = np.random.default_rng()
+            spent = 0.0
+            while not stop_event.is_set() and spent < budget_seconds:
+                with self._idle:
+                    while self._foreground and not stop_event.is_set():
+                        self._idle.wait()
+                started = time.thread_time()
+                done = mcts_search(node, self.chunk, stop_event.is_set, prior, rng)
+                spent += time.thread_time() - started
+                if not done:
+                    break
+        finally:
+            self._slots.release()
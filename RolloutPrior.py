@@ -0,0 +1,197 @@
+import argparse
+
+import numpy as np
+
+from GameLog import iter_games
+from GameRecord import GameRecord
+
+# Neighbour offsets (row, col) of the 3x3 pattern around a cell, the cell itself excluded
+NEIGHBOURS = np.array(
+    [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+)
+# Base-4 place value of each neighbour in the pattern index
+PLACE_VALUES = 4 ** np.arange(len(NEIGHBOURS))
+N_PATTERNS = 4 ** len(NEIGHBOURS)
+# Neighbour states: empty, own piece, opponent piece, off the board
+EMPTY, OWN, OPPONENT, OFF_BOARD = 0, 1, 2, 3
+
+
+class RolloutPrior:
+    """
+    A class holding learned move priors keyed by the 3x3 pattern around the landing cell.
+
+    A pattern encodes the eight neighbours of the cell a piece lands in, seen from the
+    player to move (empty, own, opponent or off the board), as a base-4 number. The table
+    maps each of the 4 ** 8 patterns to the smoothed win rate of moves that landed in it.
+
+    Attributes:
+        table (np.ndarray): The float32 win rate of each pattern, possibly memory-mapped.
+
+    Methods:
+        load(path): Loads a table saved by `train`, memory-mapped read-only.
+        pattern_indices(board, cells, player): Gets the pattern index of each landing cell.
+        weights(board, cols, player): Gets the prior weight of each candidate column.
+        choose(board, cols, player, draw): Picks a column in proportion to its weight.
+    """
+
+    def __init__(self, table):
+        """Initialize a prior from a pattern table.
+
+        Args:
+            table (np.ndarray): The win rate of each of the N_PATTERNS patterns.
+        """
+        self.table = table
+
+    @staticmethod
+    def load(path: str):
+        """Load a table saved by `train`.
+
+        The file is memory-mapped, so loading it before forking workers lets them share
+        its pages.
+
+        Args:
+            path (str): The path of the .npy file.
+
+        Returns:
+            RolloutPrior: The loaded prior.
+        """
+        return RolloutPrior(np.load(path, mmap_mode="r"))
+
+    @staticmethod
+    def pattern_indices(board, cells, player: int) -> np.ndarray:
+        """Get the pattern index of each of the given cells.
+
+        Args:
+            board (np.ndarray): The board cells (0 and 1 for the players, 2 for empty).
+            cells (np.ndarray): The (row, col) pairs of the cells, shape (n, 2).
+            player (int): The player about to move.
+
+        Returns:
+            np.ndarray: The pattern index of each cell.
+        """
+        # Map board values 0, 1, 2 to neighbour states relative to the player
+        states = np.array([OWN, OPPONENT, EMPTY]) if player == 0 else np.array(
+            [OPPONENT, OWN, EMPTY]
+        )
+        padded = np.pad(states[board], 1, constant_values=OFF_BOARD)
+        around = np.asarray(cells)[:, None, :] + 1 + NEIGHBOURS
+        return padded[around[..., 0], around[..., 1]] @ PLACE_VALUES
+
+    def weights(self, board, cols, player: int) -> np.ndarray:
+        """Get the prior weight of dropping a piece in each of the given columns.
+
+        Args:
+            board (Board): The board to move on.
+            cols (list): The candidate columns; none of them may be full.
+            player (int): The player about to move.
+
+        Returns:
+            np.ndarray: The weight of each column.
+        """
+        cells = [(board.get_next_open_row(col), col) for col in cols]
+        return self.table[self.pattern_indices(board.get_board(), cells, player)]
+
+    def choose(self, board, cols, player: int, draw: float) -> int:
+        """Pick one of the given columns in proportion to its prior weight.
+
+        Args:
+            board (Board): The board to move on.
+            cols (list): The candidate columns; none of them may be full.
+            player (int): The player about to move.
+            draw (float): A uniform random number in [0, 1) that selects the column.
+
+        Returns:
+            int: The chosen column.
+        """
+        cumulative = np.cumsum(self.weights(board, cols, player))
+        index = np.searchsorted(cumulative, draw * cumulative[-1], side="right")
+        return cols[min(int(index), len(cols) - 1)]
+
+
+def train(records, outcomes) -> np.ndarray:
+    """
+    Builds a pattern table from completed games.
+
+    Every move adds its game's outcome for the mover (1 win, 0.5 draw, 0 loss) to the
+    pattern around its landing cell. Win rates are Laplace-smoothed so unseen patterns get
+    a neutral 0.5.
+
+    Parameters:
+    records (iterable): The GameRecord of each game.
+    outcomes (iterable): The winner of each game (0, 1, or 2 for a draw).
+
+    Returns:
+    np.ndarray: The float32 win rate of each of the N_PATTERNS patterns.
+    """
+    wins = np.zeros(N_PATTERNS)
+    counts = np.zeros(N_PATTERNS)
+    for record, winner in zip(records, outcomes):
+        replayed = GameRecord(record.rows, record.cols, record.win_length)
+        for col in record.moves:
+            player = replayed.turn()
+            row = replayed.board().get_next_open_row(col)
+            index = RolloutPrior.pattern_indices(
+                replayed.board().get_board(), [(row, col)], player
+            )[0]
+            counts[index] += 1
+            wins[index] += 0.5 if winner == 2 else float(winner == player)
+            replayed.play(col)
+    return ((wins + 1) / (counts + 2)).astype(np.float32)
+
+
+def self_play(n_games: int, rows: int, cols: int, win_length: int = 4, rng=None):
+    """
+    Plays uniformly random games to train on when there are not enough logged games.
+
+    Parameters:
+    n_games (int): The number of games to play.
+    rows (int): The number of rows in the board.
+    cols (int): The number of columns in the board.
+    win_length (int, optional): The number of pieces in a row needed to win. Defaults to 4.
+    rng (np.random.Generator, optional): The random stream; a freshly seeded one if omitted.
+
+    Yields:
+    GameRecord: Each finished game.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    for _ in range(n_games):
+        record = GameRecord(rows, cols, win_length)
+        while not record.is_over():
+            valid = record.board().valid_moves()
+            record.play(valid[rng.integers(len(valid))])
+        yield record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train a rollout prior table.")
+    parser.add_argument("--log", help="JSONL game log to train on.")
+    parser.add_argument("--self-play", type=int, default=0, help="Random games to add.")
+    parser.add_argument("--rows", type=int, default=6)
+    parser.add_argument("--cols", type=int, default=7)
+    parser.add_argument("--win-length", type=int, default=4)
+    parser.add_argument("--out", default="rollout_prior.npy")
+    parser.add_argument("--seed", type=int, help="Seed for self-play games.")
+    args = parser.parse_args()
+
+    records = []
+    if args.log:
+        records.extend(record for _, record in iter_games(args.log))
+    records.extend(
+        self_play(
+            args.self_play,
+            args.rows,
+            args.cols,
+            args.win_length,
+            np.random.default_rng(args.seed),
+        )
+    )
+    if not records:
+        raise SystemExit("No games to train on; pass --log and/or --self-play.")
+    table = train(records, [record.winner() for record in records])
+    np.save(args.out, table)
+    print(f"Trained on {len(records)} games, wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
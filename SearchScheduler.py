@@ -0,0 +1,86 @@
+import threading
+from contextlib import contextmanager
+
+
+class SearchScheduler:
+    """
+    A class that shares a fixed number of concurrent AI searches across all games.
+
+    Searches are admitted in arrival order (first come, first served) whenever one of the
+    slots is free, so no game can overtake others that were already waiting. When more
+    searches are running or queued than there are slots, every tier below the highest
+    priority has its budget scaled down by slots / load, never below `min_share` of its
+    configured budget, so that queues drain instead of latency growing for everyone.
+
+    Attributes:
+        slots (int): The number of searches that may run at the same time.
+        min_share (float): The smallest fraction of a tier's budget a search is given.
+        top_priority (int): The priority whose budget is never degraded.
+
+    Methods:
+        slot(tier): Context manager waiting for a free slot and yielding the granted budget.
+        load(): Returns the number of searches running or waiting.
+    """
+
+    def __init__(self, slots: int = 2, min_share: float = 0.25, top_priority: int = 0):
+        """
+        Initialize a new SearchScheduler.
+
+        Args:
+            slots (int, optional): The number of searches that may run at the same time.
+                Defaults to 2.
+            min_share (float, optional): The smallest fraction of a tier's budget a search
+                is given under load. Defaults to 0.25.
+            top_priority (int, optional): The priority whose budget is never degraded.
+                Defaults to 0.
+        """
+        self.slots = slots
+        self.min_share = min_share
+        self.top_priority = top_priority
+        self._cond = threading.Condition()
+        self._next_ticket = 0
+        self._serving = 0
+        self._active = 0
+
+    def load(self) -> int:
+        """
+        Get the number of searches running or waiting for a slot.
+
+        Returns:
+            int: The current load.
+        """
+        with self._cond:
+            return self._active + self._next_ticket - self._serving
+
+    @contextmanager
+    def slot(self, tier: dict):
+        """
+        Wait for a free search slot and yield the budget granted to the search.
+
+        Args:
+            tier (dict): The difficulty tier with "iterations", "time_limit" and "priority".
+
+        Yields:
+            dict: A copy of the tier with "iterations" and "time_limit" scaled for the load
+                at admission time.
+        """
+        with self._cond:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            while ticket != self._serving or self._active >= self.slots:
+                self._cond.wait()
+            load = self._active + self._next_ticket - self._serving
+            self._serving += 1
+            self._active += 1
+            self._cond.notify_all()
+        budget = dict(tier)
+        if load > self.slots and tier["priority"] < self.top_priority:
+            share = max(self.min_share, self.slots / load)
+            budget["iterations"] = max(1, int(tier["iterations"] * share))
+            budget["time_limit"] = tier["time_limit"] * share
+        try:
+            yield budget
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
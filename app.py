@@ -1,14 +1,21 @@
+import atexit
 import json
+import os
 
+import numpy as np
 from flask import Flask, render_template, request, session, jsonify
 from flask_session import Session
 from flask_cors import CORS
 import random
 import string
 import time
-from Board import Board
+from GameLog import GameLog
+from GameRecord import GameRecord
 from MCTSTreeNode import MCTSTreeNode
-from Connect4Game import mcts_n
+from Engine import mcts_n, preload, random_move, search_stats
+from Ponderer import Ponderer
+from RolloutPrior import RolloutPrior
+from SearchScheduler import SearchScheduler
 
 import glog as logger
 
@@ -20,6 +27,9 @@ app.config['SESSION_USE_SIGNER'] = True
 app.config['CORS_SUPPORTS_CREDENTIALS'] = True
 app.config["SESSION_COOKIE_SAMESITE"] = "None"
 app.config["SESSION_COOKIE_SECURE"] = True
+# Session files go to CONNECT4_SESSION_DIR when set, e.g. by loadtest.py
+if "CONNECT4_SESSION_DIR" in os.environ:
+    app.config["SESSION_FILE_DIR"] = os.environ["CONNECT4_SESSION_DIR"]
 
 Session(app)
 CORS(app, supports_credentials=True)
@@ -31,11 +41,179 @@ rate_limits = {}
 # Placeholder for game state and logic
 games = {}
 
+# Number of pieces in a row needed to win when /new_game does not specify one
+DEFAULT_WIN_LENGTH = 4
+
+# Difficulty tiers and the search budget each maps to. "rollout" is "uniform" or "prior"
+# (learned pattern priors, falling back to uniform when no table is loaded). No tier uses
+# priors yet: they lose to uniform rollouts at equal time (benchmarks.py prior). Under load the
+# scheduler scales the iterations and time limit of every tier below the top priority.
+# "ponder_seconds" is the CPU time an MCTS game may search during the human's turn.
+DIFFICULTY_TIERS = {
+    "beginner": {
+        "engine": "random",
+        "iterations": 0,
+        "time_limit": 0.0,
+        "rollout": "uniform",
+        "priority": 0,
+        "ponder_seconds": 0.0,
+    },
+    "easy": {
+        "engine": "mcts",
+        "iterations": 50,
+        "time_limit": 0.5,
+        "rollout": "uniform",
+        "priority": 1,
+        "ponder_seconds": 0.25,
+    },
+    "medium": {
+        "engine": "mcts",
+        "iterations": 200,
+        "time_limit": 2.0,
+        "rollout": "uniform",
+        "priority": 2,
+        "ponder_seconds": 1.0,
+    },
+    "hard": {
+        "engine": "mcts",
+        "iterations": 1000,
+        "time_limit": 5.0,
+        "rollout": "uniform",
+        "priority": 3,
+        "ponder_seconds": 2.0,
+    },
+}
+DEFAULT_DIFFICULTY = "medium"
+
+# Build the engine tables before workers are forked so they share them copy-on-write
+preload()
+
+# Learned rollout priors, trained offline with RolloutPrior.py and memory-mapped once here
+ROLLOUT_PRIOR_PATH = os.environ.get("CONNECT4_ROLLOUT_PRIOR", "rollout_prior.npy")
+rollout_prior = (
+    RolloutPrior.load(ROLLOUT_PRIOR_PATH) if os.path.exists(ROLLOUT_PRIOR_PATH) else None
+)
+
+# Server-wide search slots shared by all games
+SEARCH_SLOTS = 2
+scheduler = SearchScheduler(
+    SEARCH_SLOTS,
+    top_priority=max(tier["priority"] for tier in DIFFICULTY_TIERS.values()),
+)
+
+# Pondering: games searching during the human's think time; each tier sets its CPU budget
+PONDER_MAX_WORKERS = 2
+ponderer = Ponderer(PONDER_MAX_WORKERS)
+
+# Completed games are appended to this JSONL log, see GameLog.py for the replay tool
+GAME_LOG_PATH = os.environ.get("CONNECT4_GAME_LOG", "games.jsonl")
+game_log = GameLog(GAME_LOG_PATH)
+atexit.register(game_log.close)
+
+# Board encodings a client can ask for with the "format" field
+BOARD_FORMATS = ("full", "compact", "delta")
+
 
 def generate_game_id():
     return "".join(random.choices(string.ascii_uppercase + string.digits, k=10))
 
 
+def finish_game(game_id, game):
+    """
+    Stops a completed game's background work, appends it to the game log and logs the
+    search statistics.
+
+    Parameters:
+    game_id (str): The ID of the game.
+    game (dict): The game's entry in `games`.
+
+    Returns:
+    None
+    """
+    ponderer.stop(game_id)
+    game_log.append(game_id, game["record"], difficulty=game["difficulty"])
+    logger.info("Search stats: %s", search_stats.snapshot())
+
+
+def pondered_subtree(pondered, board):
+    """
+    Finds the subtree of a pondered node that matches the position after the human's move.
+
+    Parameters:
+    pondered (MCTSTreeNode): The node searched while the human was thinking, or None.
+    board (np.ndarray): The board after the human's move.
+
+    Returns:
+    MCTSTreeNode: The matching child detached from its parent, or None if the reply was
+        never expanded.
+    """
+    if pondered is None:
+        return None
+    for child in pondered.children:
+        if np.array_equal(child.state.get_board(), board):
+            child.parent = None
+            return child
+    return None
+
+
+def tier_prior(tier):
+    """
+    Gets the rollout priors a difficulty tier searches with.
+
+    Parameters:
+    tier (dict): The difficulty tier.
+
+    Returns:
+    RolloutPrior: The loaded priors, or None for uniform rollouts.
+    """
+    return rollout_prior if tier["rollout"] == "prior" else None
+
+
+def search_move(root_node, budget, rng):
+    """
+    Picks the AI's move with the engine and budget of a difficulty tier.
+
+    Parameters:
+    root_node (MCTSTreeNode): The node to move from.
+    budget (dict): The tier budget granted by the scheduler.
+    rng (np.random.Generator): The random stream of the search.
+
+    Returns:
+    MCTSTreeNode: The node of the chosen move.
+    """
+    if budget["engine"] == "random":
+        return random_move(root_node, rng)
+    return mcts_n(
+        root_node, budget["iterations"], budget["time_limit"], tier_prior(budget), rng
+    )
+
+
+def board_payload(board_state, board_format="full", previous=None):
+    """
+    Serializes a board for a JSON response in the requested format.
+
+    Parameters:
+    board_state (Board): The board to serialize.
+    board_format (str): "full" for the nested list of cells, "compact" for the base64 bitboard
+        pair produced by `Board.encode`, or "delta" for only the cells that differ from `previous`.
+    previous (np.ndarray): The board the client already has; required for the "delta" format.
+
+    Returns:
+    dict: The board fields to merge into the response.
+    """
+    if board_format == "compact":
+        return {
+            "board": board_state.encode(),
+            "rows": board_state.rows,
+            "cols": board_state.cols,
+        }
+    if board_format == "delta":
+        board = board_state.get_board()
+        changed = np.argwhere(board != previous)
+        return {"cells": [[int(r), int(c), int(board[r, c])] for r, c in changed]}
+    return {"board": board_state.get_board().tolist()}
+
+
 @app.route("/")
 def index():
     return render_template("index.html")
@@ -47,11 +225,12 @@ def get_game():
     Retrieves the current game state.
 
     This function retrieves the game ID from the session and checks if a game with that ID exists in the games dictionary.
-    If a game is found, it returns the game ID and the current game board state as a JSON response.
+    If a game is found, it returns the game ID, the current game board state and the moves played so far
+    as a JSON response.
     If no active game is found, it returns an error message as a JSON response.
 
     Parameters:
-    None
+    format (str, query string): "full" (default) or "compact", see `board_payload`.
 
     Returns:
     flask.Response: A JSON response containing the game ID and the current game board state if a game is found.
@@ -60,7 +239,30 @@ def get_game():
     game_id = session.get("game_id")
     if not game_id or game_id not in games:
         return jsonify({"error": "No active game found."}), 400
-    return jsonify({"game_id": game_id, "board": games[game_id]["state"]})
+    board_format = request.args.get("format", "full")
+    if board_format not in ("full", "compact"):
+        return jsonify({"error": "Invalid format."}), 400
+    record = games[game_id]["record"]
+    return jsonify(
+        {
+            "game_id": game_id,
+            **board_payload(record.board(), board_format),
+            "moves": record.moves,
+        }
+    )
+
+
+@app.route("/stats", methods=["GET"])
+def stats():
+    """
+    Reports how often the AI skipped its search because its move was forced.
+
+    Returns:
+    flask.Response: A JSON response with the counters of `Engine.search_stats` since the
+        server started: searched and skipped moves, the share skipped, the mean search time
+        and the estimated latency saved, in milliseconds.
+    """
+    return jsonify(search_stats.snapshot())
 
 
 @app.route("/new_game", methods=["POST"])
@@ -89,25 +291,43 @@ def new_game():
             return "Invalid number of rows.", 400
         if "cols" not in data:
             return "Invalid number of columns.", 400
-
-    def initialize_new_game(rows_local, cols_local):
+        win_length_local = data.get("win_length", DEFAULT_WIN_LENGTH)
+        if (
+            not isinstance(win_length_local, int)
+            or win_length_local < 2
+            or win_length_local > max(data["rows"], data["cols"])
+        ):
+            return "Invalid win length.", 400
+        if data.get("format", "full") not in ("full", "compact"):
+            return "Invalid format.", 400
+        if data.get("difficulty", DEFAULT_DIFFICULTY) not in DIFFICULTY_TIERS:
+            return "Invalid difficulty.", 400
+
+    def initialize_new_game(rows_local, cols_local, win_length_local, difficulty_local):
         """
         Initializes a new game with the given number of rows and columns.
 
         Parameters:
         rows_local (int): The number of rows in the game board.
         cols_local (int): The number of columns in the game board.
+        win_length_local (int): The number of pieces in a row needed to win.
+        difficulty_local (str): The key of the game's tier in DIFFICULTY_TIERS.
 
         Returns:
         tuple: A tuple containing the game ID and the initial game board.
         """
-        new_board_local = Board(rows_local, cols_local)
+        record_local = GameRecord(rows_local, cols_local, win_length_local)
         game_id_local = generate_game_id()
-        games[game_id_local] = {"state": new_board_local, "turn": 0}
+        games[game_id_local] = {
+            "record": record_local,
+            "difficulty": difficulty_local,
+            "seeds": np.random.SeedSequence(),
+        }
         session["game_id"] = game_id_local
         session["rows"] = rows_local
         session["cols"] = cols_local
-        return game_id_local, new_board_local
+        session["win_length"] = win_length_local
+        return game_id_local, record_local.board()
 
     data = request.get_json()
     error = validate_new_game_data(data)
@@ -116,9 +336,18 @@ def new_game():
 
     rows = data["rows"]
     cols = data["cols"]
-    game_id, new_board = initialize_new_game(rows, cols)
+    win_length = data.get("win_length", DEFAULT_WIN_LENGTH)
+    difficulty = data.get("difficulty", DEFAULT_DIFFICULTY)
+    game_id, new_board = initialize_new_game(rows, cols, win_length, difficulty)
 
-    response = jsonify({"game_id": game_id, "board": new_board.get_board().tolist()})
+    response = jsonify(
+        {
+            "game_id": game_id,
+            **board_payload(new_board, data.get("format", "full")),
+            "win_length": win_length,
+            "difficulty": difficulty,
+        }
+    )
     response.headers.add('Access-Control-Allow-Origin', 'http://localhost:3000')
     response.headers.add('Access-Control-Allow-Credentials', 'true')
     return response
@@ -131,9 +360,14 @@ def play(game_id):
 
     Parameters:
     request (flask.Request): The incoming request object containing the game ID and the column where the player wants to place their disc.
+        An optional "format" field selects the board encoding, see `board_payload`; "delta" returns
+        only the cells placed by this move and the AI's reply. An optional integer "seed" makes the AI's
+        search reproducible; seeded moves do not reuse the pondered tree and search the tier's
+        full iteration count with no time limit, so neither server load nor speed changes them.
 
     Returns:
     flask.Response: A JSON response containing the updated game board, the current turn, and the winner if the game is over.
+        "ponder_visits" counts the visits pondering added to the subtree of the human's move.
     """
     data = request.get_json()
     GAME_ID = game_id
@@ -143,7 +377,6 @@ def play(game_id):
     if game_id != GAME_ID:
         return jsonify({"error": "Invalid game ID."}), 400
 
-    ROWS = session.get("rows")
     COLS = session.get("cols")
 
     # Check if a game is active
@@ -151,15 +384,19 @@ def play(game_id):
         return jsonify({"error": "No active game found."}), 400
 
     col = data.get("col")
+    board_format = data.get("format", "full")
+    seed = data.get("seed")
 
     # Check if the selected column is valid
     if col is None or col < 0 or col >= COLS:
         return jsonify({"error": "Invalid column."}), 400
+    if board_format not in BOARD_FORMATS:
+        return jsonify({"error": "Invalid format."}), 400
+    if seed is not None and (not isinstance(seed, int) or seed < 0):
+        return jsonify({"error": "Invalid seed."}), 400
 
     game = games[game_id]
-    board_state = game["state"]
-    board = board_state.get_board()
-    turn = game["turn"]
+    record = game["record"]
 
     # Add rate limiting to prevent abuse
     user_ip = request.remote_addr
@@ -174,48 +411,91 @@ def play(game_id):
                 429,
             )
 
-    # Human player move
-    if board[0, col] == 2:
-        for i in range(ROWS):
-            if board[ROWS - i - 1, col] == 2:
-                board[ROWS - i - 1, col] = turn
-                break
-        game["turn"] ^= 1
+    if record.is_over():
+        return jsonify({"error": "Game is over."}), 400
+    pondered, start_visits = ponderer.stop(game_id)
+    previous = record.board().get_board().copy()
 
-    root_node = MCTSTreeNode(board_state, None, game["turn"], 0)
+    # Human player move
+    try:
+        record.play(col)
+    except ValueError:
+        return jsonify({"error": "Column is full."}), 400
+    board_state = record.board()
 
     # Check for win or draw after human move
-    if board_state.check_win() != 2 or root_node.check_draw():
-        print(board.get_board())
+    if record.is_over():
+        finish_game(game_id, game)
         return (
             jsonify(
                 {
-                    "board": board.get_board().tolist(),
-                    "turn": str(game["turn"]),
-                    "winner": str(board_state.check_win()),
+                    **board_payload(board_state, board_format, previous),
+                    "turn": str(record.turn()),
+                    "winner": str(record.winner()),
                 }
             ),
             200,
         )
 
-    # AI move
-    best_move = mcts_n(
-        root_node, 200
-    )  # You can adjust the number of iterations for AI strength
-    board = best_move.state
-    game["turn"] ^= 1
-    game["state"] = board
+    # A seeded move searches a fresh tree so that it can be reproduced; otherwise each
+    # move spawns independent streams for its search and pondering from the game's seed
+    if seed is None:
+        search_seed, ponder_seed = game["seeds"].spawn(2)
+        root_node = pondered_subtree(pondered, board_state.get_board())
+    else:
+        search_seed, ponder_seed = np.random.SeedSequence(seed).spawn(2)
+        root_node = None
+    # Only count the visits pondering added; the subtree also holds the AI's own search
+    ponder_visits = 0
+    if root_node is not None:
+        key = board_state.get_board().tobytes()
+        ponder_visits = root_node.visits - start_visits.get(key, 0)
+    if root_node is None:
+        root_node = MCTSTreeNode(board_state, None, record.turn(), 0)
+
+    # AI move, with the search budget of the game's difficulty tier
+    tier = DIFFICULTY_TIERS[game["difficulty"]]
+    queued = time.perf_counter()
+    with scheduler.slot(tier) as budget, ponderer.foreground():
+        if seed is not None:
+            # Reproducible whatever the load: the tier's full iterations and no time limit
+            budget = {**tier, "time_limit": None}
+        started = time.perf_counter()
+        best_move = search_move(root_node, budget, np.random.default_rng(search_seed))
+        searched = time.perf_counter()
+    record.play_board(best_move.state)
+    board = record.board()
+    logger.info("Game %s gained %d visits from pondering", game_id, ponder_visits)
+
+    if record.is_over():
+        finish_game(game_id, game)
+    elif tier["engine"] == "mcts" and tier["ponder_seconds"] > 0:
+        # Keep searching the position while the human thinks about their reply
+        best_move.parent = None
+        ponderer.start(
+            game_id,
+            best_move,
+            tier_prior(tier),
+            np.random.default_rng(ponder_seed),
+            tier["ponder_seconds"],
+        )
 
     response = jsonify(
             {
-                "board": board.get_board().tolist(),
-                "turn": str(game["turn"]),
-                "winner": str(board.check_win()),
+                **board_payload(board, board_format, previous),
+                "turn": str(record.turn()),
+                "winner": str(record.winner()),
+                "ponder_visits": ponder_visits,
             }
         )
-    print(response)
     response.headers.add('Access-Control-Allow-Origin', 'http://localhost:3000')
     response.headers.add('Access-Control-Allow-Credentials', 'true')
+    # Time spent waiting for a search slot and searching, so clients such as loadtest.py
+    # can tell the AI's share of the latency from the request overhead
+    response.headers.add(
+        "Server-Timing",
+        f"queue;dur={(started - queued) * 1e3:.2f}, search;dur={(searched - started) * 1e3:.2f}",
+    )
     return response
 
 
@@ -0,0 +1,403 @@
+"""
+Micro-benchmarks for the Connect Four engine.
+
+Usage:
+    python benchmarks.py win [--repeat N]
+    python benchmarks.py wire [--repeat N]
+    python benchmarks.py prior PRIOR.npy [--games N] [--seconds S]
+    python benchmarks.py startup [--runs N]
+    python benchmarks.py rng [--repeat N]
+    python benchmarks.py render [--frames N]
+    python benchmarks.py threats [--games N] [--iterations N]
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import timeit
+
+import numpy as np
+
+from Board import Board, winning_lines
+from Engine import mcts_n, search_stats
+from GameRecord import GameRecord
+from MCTSTreeNode import MCTSTreeNode
+from RolloutPrior import RolloutPrior
+
+
+def quiet_position(rows, cols, win_length, rng):
+    """
+    Plays random legal moves, alternating players, without ever completing a line.
+
+    Parameters:
+    rows (int): The number of rows in the board.
+    cols (int): The number of columns in the board.
+    win_length (int): The number of pieces in a row needed to win.
+    rng (np.random.Generator): The stream the moves are drawn from.
+
+    Returns:
+    Board: A position without a winner, half full unless every move left would win first.
+    """
+    board = Board(rows, cols, win_length)
+    player = 0
+    for _ in range(rows * cols // 2):
+        winning = board.winning_moves(player)
+        moves = [c for c in board.valid_moves() if c not in winning]
+        if not moves:
+            break
+        col = moves[rng.integers(len(moves))]
+        board.set_board(board.get_next_open_row(col), col, player)
+        player ^= 1
+    return board
+
+
+def bench_win_checks(repeat=2000):
+    """
+    Measures the per-call cost of `Board.check_win` across win lengths and board sizes.
+
+    Each board holds a position reached by random alternating play that stops before anyone
+    wins, so that every check finds no winner. "scan" times a board whose cells were just
+    replaced, which gathers every line; "counts" times the same position on a board that
+    keeps incremental line counts, as the boards of the search do.
+
+    Parameters:
+    repeat (int): The number of checks timed per configuration.
+
+    Returns:
+    None
+    """
+    rng = np.random.default_rng(0)
+    print(
+        f"{'rows':>4} {'cols':>4} {'K':>2} {'lines':>6} {'pieces':>6} "
+        f"{'scan us':>8} {'counts us':>9}"
+    )
+    for rows, cols in ((6, 7), (9, 10), (12, 14)):
+        for win_length in range(3, 7):
+            counted = quiet_position(rows, cols, win_length, rng)
+            assert counted.check_win() == 2
+            scanned = Board(rows, cols, win_length)
+            scanned.set_whole_board(counted.get_board().copy())
+            timings = [
+                timeit.timeit(board.check_win, number=repeat) / repeat * 1e6
+                for board in (scanned, counted)
+            ]
+            n_lines = len(winning_lines(rows, cols, win_length))
+            pieces = np.count_nonzero(counted.get_board() != 2)
+            print(
+                f"{rows:>4} {cols:>4} {win_length:>2} {n_lines:>6} {pieces:>6} "
+                f"{timings[0]:>8.2f} {timings[1]:>9.2f}"
+            )
+
+
+def bench_wire_formats(repeat=200):
+    """
+    Measures the JSON payload size and serialization time of each /play board format.
+
+    Boards are half full and the delta covers the two cells placed by one /play round trip.
+
+    Parameters:
+    repeat (int): The number of serializations timed per configuration.
+
+    Returns:
+    None
+    """
+    from app import BOARD_FORMATS, board_payload
+
+    rng = np.random.default_rng(0)
+    print(f"{'rows':>4} {'cols':>4} {'format':>8} {'bytes':>7} {'us/response':>12}")
+    for rows, cols in ((6, 7), (20, 20), (50, 50), (100, 100)):
+        board = Board(rows, cols)
+        cells = np.full(rows * cols, 2, dtype=int)
+        filled = rng.permutation(rows * cols)[: rows * cols // 2]
+        cells[filled] = rng.integers(0, 2, len(filled))
+        board.set_whole_board(cells.reshape(rows, cols))
+        previous = board.get_board().copy()
+        previous.ravel()[filled[:2]] = 2
+        for board_format in BOARD_FORMATS:
+
+            def serialize(fmt=board_format):
+                return json.dumps(board_payload(board, fmt, previous))
+
+            seconds = timeit.timeit(serialize, number=repeat)
+            print(
+                f"{rows:>4} {cols:>4} {board_format:>8} {len(serialize()):>7} "
+                f"{seconds / repeat * 1e6:>12.1f}"
+            )
+
+
+def play_match(agents, rows=6, cols=7, win_length=4):
+    """
+    Plays one game between two agents.
+
+    Parameters:
+    agents (list): For each player, a callable taking the root MCTSTreeNode of the position
+        to move from and returning the node of its chosen move.
+    rows (int): The number of rows in the board.
+    cols (int): The number of columns in the board.
+    win_length (int): The number of pieces in a row needed to win.
+
+    Returns:
+    int: The winner (0 or 1), or 2 for a draw.
+    """
+    record = GameRecord(rows, cols, win_length)
+    while not record.is_over():
+        player = record.turn()
+        root_node = MCTSTreeNode(record.board(), None, player, player ^ 1)
+        record.play_board(agents[player](root_node).state)
+    return record.winner()
+
+
+def bench_prior_strength(prior_path, games=20, seconds=0.5):
+    """
+    Plays MCTS with learned rollout priors against MCTS with uniform rollouts.
+
+    Both sides get the same wall-clock time per move and an unbounded iteration count, so
+    the slower prior-guided rollouts have to pay for themselves. Sides alternate moving first.
+
+    Parameters:
+    prior_path (str): The path of a table trained with RolloutPrior.py.
+    games (int): The number of games to play.
+    seconds (float): The search time per move.
+
+    Returns:
+    None
+    """
+    prior = RolloutPrior.load(prior_path)
+
+    def prior_agent(root_node):
+        return mcts_n(root_node, 10**9, seconds, prior)
+
+    def uniform_agent(root_node):
+        return mcts_n(root_node, 10**9, seconds)
+
+    results = {"win": 0, "draw": 0, "loss": 0}
+    for game in range(games):
+        prior_player = game % 2
+        agents = [uniform_agent, uniform_agent]
+        agents[prior_player] = prior_agent
+        winner = play_match(agents)
+        if winner == 2:
+            results["draw"] += 1
+        elif winner == prior_player:
+            results["win"] += 1
+        else:
+            results["loss"] += 1
+    print(
+        f"prior vs uniform at {seconds}s/move over {games} games: "
+        f"{results['win']} wins, {results['draw']} draws, {results['loss']} losses"
+    )
+
+
+# Imports a module in a fresh interpreter and prints its import time and peak RSS
+STARTUP_PROBE = """
+import resource, sys, time
+started = time.perf_counter()
+__import__(sys.argv[1])
+seconds = time.perf_counter() - started
+print(seconds, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def bench_startup(runs=5):
+    """
+    Measures the import time and peak RSS of a worker for each entry point.
+
+    Every import runs in a fresh interpreter from an empty working directory, so files the
+    server creates on import (sessions, game log) do not land in the repository.
+
+    Parameters:
+    runs (int): The number of fresh interpreters per module; the best time is reported.
+
+    Returns:
+    None
+    """
+    repo = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=repo)
+    print(f"{'module':>13} {'import ms':>10} {'max RSS MB':>11}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for module in ("Engine", "app", "Connect4Game"):
+            samples = []
+            for _ in range(runs):
+                probe = subprocess.run(
+                    [sys.executable, "-c", STARTUP_PROBE, module],
+                    cwd=workdir,
+                    env=env,
+                    capture_output=True,
+                    text=True,
+                    check=False,
+                )
+                if probe.returncode != 0:
+                    break
+                seconds, max_rss_kb = probe.stdout.split()[-2:]
+                samples.append((float(seconds), int(max_rss_kb)))
+            if not samples:
+                print(f"{module:>13} {'unavailable':>10}")
+                continue
+            seconds, max_rss_kb = min(samples)
+            print(f"{module:>13} {seconds * 1e3:>10.1f} {max_rss_kb / 1024:>11.1f}")
+
+
+def bench_rng(repeat=2000):
+    """
+    Measures the random number overhead of one playout on a 6x7 board.
+
+    Compares one `random.choice` per ply (the old rollout), one Generator call per ply and
+    a single bulk Generator draw for the whole playout, against the cost of a full rollout.
+
+    Rollouts draw in bulk so that every random choice comes from a seedable Generator, not
+    for speed: the bulk draw costs about as much as `random.choice` per ply (either can be
+    ahead from run to run), and both are a small share of a full rollout. Calling the
+    Generator once per ply is the slow option the bulk draw avoids.
+
+    Parameters:
+    repeat (int): The number of playouts timed per strategy.
+
+    Returns:
+    None
+    """
+    plies = 42
+    cols = list(range(7))
+    rng = np.random.default_rng(0)
+
+    def per_ply_random():
+        for _ in range(plies):
+            random.choice(cols)
+
+    def per_ply_generator():
+        for _ in range(plies):
+            cols[rng.integers(len(cols))]
+
+    def bulk_generator():
+        draws = rng.random(plies)
+        for ply in range(plies):
+            cols[int(draws[ply] * len(cols))]
+
+    node = MCTSTreeNode(Board(6, 7), None, 1, 0)
+    timings = {
+        "random.choice per ply": per_ply_random,
+        "Generator per ply": per_ply_generator,
+        "Generator bulk": bulk_generator,
+        "full rollout": lambda: node.simulation(node.level, None, rng),
+    }
+    rollout = timeit.timeit(timings.pop("full rollout"), number=repeat)
+    for name, playout in timings.items():
+        seconds = timeit.timeit(playout, number=repeat)
+        print(
+            f"{name:>22}: {seconds / repeat * 1e6:8.1f} us/playout "
+            f"({seconds / rollout:5.1%} of a rollout)"
+        )
+    print(f"{'full rollout':>22}: {rollout / repeat * 1e6:8.1f} us/playout")
+
+
+def bench_render(frames=500):
+    """
+    Measures the time to render one frame of the pygame front end.
+
+    Runs headless through SDL's dummy video driver and compares redrawing the whole board
+    with redrawing only the cell of the last move, on an empty and a full board.
+
+    Parameters:
+    frames (int): The number of frames timed per case.
+
+    Returns:
+    None
+    """
+    # Imported lazily so the other benchmarks do not need pygame
+    from Connect4Game import Cols, Rows, SQUARE_SIZE, draw_board, init_display
+
+    screen, _, radius = init_display(headless=True)
+    empty = Board(Rows, Cols).get_board()
+    full = np.indices((Rows, Cols)).sum(axis=0) % 2
+    for name, board in (("empty", empty), ("full", full)):
+        previous = board.copy()
+        previous[0, 0] = 2 if board[0, 0] != 2 else 0
+        timings = {
+            "full redraw": lambda b=board: draw_board(b, screen, SQUARE_SIZE, radius),
+            "dirty rects": lambda b=board, p=previous: draw_board(
+                b, screen, SQUARE_SIZE, radius, p
+            ),
+        }
+        for case, render in timings.items():
+            seconds = timeit.timeit(render, number=frames)
+            print(f"{name:>5} {case:>11}: {seconds / frames * 1e6:8.1f} us/frame")
+
+
+def bench_threats(games=10, iterations=200, seed=0):
+    """
+    Measures how often threat analysis lets MCTS self-play skip the search.
+
+    Parameters:
+    games (int): The number of games to play on a 6x7 board.
+    iterations (int): The iteration budget of every search.
+    seed (int): The seed of the searches' random streams.
+
+    Returns:
+    None
+    """
+    rng = np.random.default_rng(seed)
+
+    def agent(root_node):
+        return mcts_n(root_node, iterations, rng=rng)
+
+    search_stats.reset()
+    for _ in range(games):
+        play_match([agent, agent])
+    stats = search_stats.snapshot()
+    print(
+        f"{stats['searched'] + stats['skipped']} moves over {games} games: "
+        f"{stats['skipped']} skipped ({stats['skip_rate']:.1%}), "
+        f"mean search {stats['mean_search_ms']:.1f} ms, "
+        f"saved {stats['latency_saved_ms'] / 1e3:.2f} s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    win = commands.add_parser("win", help="Cost of a win check across K and board size.")
+    win.add_argument("--repeat", type=int, default=2000)
+
+    wire = commands.add_parser("wire", help="Payload size and serialization time per format.")
+    wire.add_argument("--repeat", type=int, default=200)
+
+    prior = commands.add_parser("prior", help="Strength of prior rollouts at equal time.")
+    prior.add_argument("table", help="Path of a table trained with RolloutPrior.py.")
+    prior.add_argument("--games", type=int, default=20)
+    prior.add_argument("--seconds", type=float, default=0.5)
+
+    startup = commands.add_parser("startup", help="Import time and RSS per worker.")
+    startup.add_argument("--runs", type=int, default=5)
+
+    rng = commands.add_parser("rng", help="Random number overhead per playout.")
+    rng.add_argument("--repeat", type=int, default=2000)
+
+    render = commands.add_parser("render", help="Render time per frame, headless.")
+    render.add_argument("--frames", type=int, default=500)
+
+    threats = commands.add_parser("threats", help="Searches skipped by forced moves.")
+    threats.add_argument("--games", type=int, default=10)
+    threats.add_argument("--iterations", type=int, default=200)
+
+    args = parser.parse_args()
+    if args.command == "win":
+        bench_win_checks(args.repeat)
+    elif args.command == "wire":
+        bench_wire_formats(args.repeat)
+    elif args.command == "prior":
+        bench_prior_strength(args.table, args.games, args.seconds)
+    elif args.command == "startup":
+        bench_startup(args.runs)
+    elif args.command == "rng":
+        bench_rng(args.repeat)
+    elif args.command == "render":
+        bench_render(args.frames)
+    elif args.command == "threats":
+        bench_threats(args.games, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import React, { useState } from 'react';
 import axios from 'axios';
 import './App.css';
+import { decodeBoard, applyDelta } from './boardCodec';
 
 function App() {
   const [board, setBoard] = useState([]);
@@ -8,14 +9,16 @@ function App() {
   const [winner, setWinner] = useState(null);
   const [rows, setRows] = useState(6);
   const [cols, setCols] = useState(5);
+  const [winLength, setWinLength] = useState(4);
+  const [difficulty, setDifficulty] = useState('medium');
   const [gameID, setGameID] = useState(null); // Assuming you have a game ID to track the game
 
-  const newGame = async (rows, cols) => {
+  const newGame = async (rows, cols, winLength, difficulty) => {
     const response = await axios.post('http://127.0.0.1:5000/new_game',
-        { rows, cols },
+        { rows, cols, win_length: winLength, difficulty, format: 'compact' },
         { withCredentials: true }
     );
-    setBoard(response.data.board);
+    setBoard(decodeBoard(response.data.board, response.data.rows, response.data.cols));
     setTurn(0);
     setWinner(null);
     setGameID(response.data.game_id); // Assuming the response contains a gameID
@@ -30,7 +33,8 @@ function App() {
     console.log(url);
     try {
       const response = await axios.post(url, {
-        col: col
+        col: col,
+        format: 'delta'
       },
           {
         withCredentials: true  // Ensure credentials are included
@@ -38,7 +42,7 @@ function App() {
       if (response.data.error) {
         alert(response.data.error);
       } else {
-        setBoard(response.data.board);
+        setBoard((current) => applyDelta(current, response.data.cells));
         setTurn(response.data.turn);
         if (response.data.winner !== "2") {
           setWinner(response.data.winner);
@@ -101,7 +105,24 @@ function App() {
             onChange={(e) => setCols(Number(e.target.value))}
           />
         </label>
-        <button onClick={() => newGame(rows, cols)}>New Game</button>
+        <label>
+          Connect:
+          <input
+            type="number"
+            value={winLength}
+            onChange={(e) => setWinLength(Number(e.target.value))}
+          />
+        </label>
+        <label>
+          Difficulty:
+          <select value={difficulty} onChange={(e) => setDifficulty(e.target.value)}>
+            <option value="beginner">Beginner</option>
+            <option value="easy">Easy</option>
+            <option value="medium">Medium</option>
+            <option value="hard">Hard</option>
+          </select>
+        </label>
+        <button onClick={() => newGame(rows, cols, winLength, difficulty)}>New Game</button>
       </div>
       {winner !== null && <h2>Winner: Player {winner}</h2>}
     </div>
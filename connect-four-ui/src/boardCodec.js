@@ -0,0 +1,32 @@
+// Decoders for the compact board encodings returned by the Flask server.
+
+const EMPTY = 2;
+
+// Decode a base64 bitboard pair (see Board.encode) into a rows x cols array of cells.
+export function decodeBoard(encoded, rows, cols) {
+  const bytes = Uint8Array.from(atob(encoded), (c) => c.charCodeAt(0));
+  const planeBytes = Math.ceil((rows * cols) / 8);
+  const isSet = (plane, i) =>
+    (bytes[plane * planeBytes + (i >> 3)] >> (7 - (i & 7))) & 1;
+  const board = [];
+  for (let r = 0; r < rows; r++) {
+    const row = [];
+    for (let c = 0; c < cols; c++) {
+      const i = r * cols + c;
+      if (isSet(0, i)) row.push(0);
+      else if (isSet(1, i)) row.push(1);
+      else row.push(EMPTY);
+    }
+    board.push(row);
+  }
+  return board;
+}
+
+// Apply a delta response's [row, col, value] cells to a board without mutating it.
+export function applyDelta(board, cells) {
+  const next = board.map((row) => row.slice());
+  for (const [r, c, value] of cells) {
+    next[r][c] = value;
+  }
+  return next;
+}
@@ -0,0 +1,22 @@
+import { decodeBoard, applyDelta } from './boardCodec';
+
+test('decodes a bitboard pair', () => {
+  // 2x3 board: player 0 at (1, 0), player 1 at (1, 2)
+  const encoded = btoa(String.fromCharCode(0b00010000, 0b00000100));
+  expect(decodeBoard(encoded, 2, 3)).toEqual([
+    [2, 2, 2],
+    [0, 2, 1],
+  ]);
+});
+
+test('applies delta cells', () => {
+  const board = [
+    [2, 2],
+    [2, 2],
+  ];
+  expect(applyDelta(board, [[1, 0, 0], [1, 1, 1]])).toEqual([
+    [2, 2],
+    [0, 1],
+  ]);
+  expect(board[1]).toEqual([2, 2]);
+});
@@ -0,0 +1,383 @@
+"""
+Load generator for the Flask app.
+
+Every simulated player starts a game with /new_game and drops pieces in random open
+columns through /play/<game_id> until the game ends, keeping its own session cookie like
+a browser tab does. Players run on a thread pool, so --concurrency is the number of games
+in flight at once.
+
+By default the app is imported and driven through Flask's test client, with the session
+files and game log written to a temporary directory that is removed after the run, and
+every player given its own client address so the per-IP rate limit applies to each of
+them separately. With --url the players talk to a running server over HTTP instead; they
+then share one address and the rate limit applies to all of them together.
+
+The latency of each /play request is split with the Server-Timing header of the response
+into the wait for a search slot, the AI search and the remaining request overhead.
+
+Usage:
+    python loadtest.py [--players N] [--concurrency C] [--sizes 6x7,6x5]
+                       [--difficulty TIER] [--think S] [--seed N] [--url URL] [--json]
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from Board import Board
+
+
+class TestClientTransport:
+    """
+    A class sending one player's requests through the app's Flask test client.
+
+    Attributes:
+        client (flask.testing.FlaskClient): The player's client; it holds the cookie jar.
+
+    Methods:
+        post(path, payload): Sends a JSON POST request.
+    """
+
+    # Session cookies are marked Secure, so the test client has to speak https
+    BASE_URL = "https://localhost"
+
+    def __init__(self, flask_app, address: str):
+        """Initialize a client for one player.
+
+        Args:
+            flask_app (flask.Flask): The app under test.
+            address (str): The client address the app sees.
+        """
+        self.client = flask_app.test_client()
+        self.client.environ_base["REMOTE_ADDR"] = address
+
+    def post(self, path: str, payload: dict):
+        """Send a JSON POST request.
+
+        Args:
+            path (str): The path of the endpoint.
+            payload (dict): The JSON body.
+
+        Returns:
+            tuple: The status code, the decoded JSON body and the Server-Timing header.
+        """
+        response = self.client.post(path, json=payload, base_url=self.BASE_URL)
+        return (
+            response.status_code,
+            response.get_json(silent=True) or {},
+            response.headers.get("Server-Timing", ""),
+        )
+
+
+class _PlainHttpCookiePolicy(http.cookiejar.DefaultCookiePolicy):
+    """A cookie policy that sends Secure cookies over plain http to a local server."""
+
+    def return_ok_secure(self, cookie, request):
+        return True
+
+
+class HttpTransport:
+    """
+    A class sending one player's requests to a running server over HTTP.
+
+    Attributes:
+        url (str): The base URL of the server.
+
+    Methods:
+        post(path, payload): Sends a JSON POST request.
+    """
+
+    def __init__(self, url: str):
+        """Initialize a connection for one player.
+
+        Args:
+            url (str): The base URL of the server, e.g. http://127.0.0.1:5000.
+        """
+        self.url = url.rstrip("/")
+        cookies = http.cookiejar.CookieJar(policy=_PlainHttpCookiePolicy())
+        self._opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(cookies)
+        )
+
+    def post(self, path: str, payload: dict):
+        """Send a JSON POST request.
+
+        Args:
+            path (str): The path of the endpoint.
+            payload (dict): The JSON body.
+
+        Returns:
+            tuple: The status code, the decoded JSON body and the Server-Timing header.
+        """
+        request = urllib.request.Request(
+            self.url + path,
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with self._opener.open(request) as response:
+                status, body, headers = response.status, response.read(), response.headers
+        except urllib.error.HTTPError as error:
+            status, body, headers = error.code, error.read(), error.headers
+        try:
+            decoded = json.loads(body)
+        except ValueError:
+            decoded = {}
+        return status, decoded, headers.get("Server-Timing", "")
+
+
+def server_timing(header: str) -> dict:
+    """
+    Parses a Server-Timing header.
+
+    Parameters:
+    header (str): The header value, e.g. "queue;dur=0.10, search;dur=41.30".
+
+    Returns:
+    dict: The duration of each metric in seconds.
+    """
+    timings = {}
+    for metric in header.split(","):
+        name, _, params = metric.strip().partition(";")
+        if params.startswith("dur="):
+            timings[name] = float(params[4:]) / 1e3
+    return timings
+
+
+def play_game(transport, rows: int, cols: int, difficulty: str, think: float, rng):
+    """
+    Plays one game as a simulated player.
+
+    Parameters:
+    transport (TestClientTransport or HttpTransport): The player's connection.
+    rows (int): The number of rows in the board.
+    cols (int): The number of columns in the board.
+    difficulty (str): The difficulty tier to play against.
+    think (float): The seconds to wait before every move.
+    rng (np.random.Generator): The stream the player's moves are drawn from.
+
+    Returns:
+    list: A (endpoint, status, seconds, timings) tuple per request, where timings holds the
+        Server-Timing durations in seconds. The game is abandoned after a failed request.
+    """
+    samples = []
+
+    def post(endpoint, path, payload):
+        started = time.perf_counter()
+        status, body, header = transport.post(path, payload)
+        samples.append((endpoint, status, time.perf_counter() - started, server_timing(header)))
+        return status, body
+
+    status, body = post(
+        "new_game",
+        "/new_game",
+        {"rows": rows, "cols": cols, "difficulty": difficulty, "format": "compact"},
+    )
+    if status != 200:
+        return samples
+    game_id = body["game_id"]
+    board = Board.decode(body["board"], rows, cols).get_board()
+    winner = "2"
+    while winner == "2":
+        open_cols = np.flatnonzero(board[0] == 2)
+        if not len(open_cols):
+            break
+        if think:
+            time.sleep(think)
+        col = int(open_cols[rng.integers(len(open_cols))])
+        status, body = post("play", f"/play/{game_id}", {"col": col, "format": "delta"})
+        if status != 200:
+            break
+        for r, c, value in body["cells"]:
+            board[r, c] = value
+        winner = body["winner"]
+    return samples
+
+
+def percentiles(values) -> dict:
+    """
+    Summarizes latencies.
+
+    Parameters:
+    values (list): The latencies in seconds.
+
+    Returns:
+    dict: The p50, p95 and p99 latencies in milliseconds, None if there are no values.
+    """
+    if not values:
+        return {"p50": None, "p95": None, "p99": None}
+    p50, p95, p99 = np.percentile(np.asarray(values) * 1e3, (50, 95, 99))
+    return {"p50": round(p50, 2), "p95": round(p95, 2), "p99": round(p99, 2)}
+
+
+def summarize(results, seconds: float) -> dict:
+    """
+    Builds the report of a run.
+
+    Parameters:
+    results (list): The samples of every player, as returned by `play_game`.
+    seconds (float): The wall-clock duration of the run.
+
+    Returns:
+    dict: Throughput, error and rate-limit rates, and latency percentiles.
+    """
+    samples = [sample for player in results for sample in player]
+    statuses = [status for _, status, _, _ in samples]
+    played = [sample for sample in samples if sample[0] == "play" and sample[1] == 200]
+    queue = [timings.get("queue", 0.0) for _, _, _, timings in played]
+    search = [timings.get("search", 0.0) for _, _, _, timings in played]
+    total = [elapsed for _, _, elapsed, _ in played]
+    overhead = [t - q - s for t, q, s in zip(total, queue, search)]
+    started = [s for s in samples if s[0] == "new_game" and s[1] == 200]
+    requests = len(samples)
+    return {
+        "players": len(results),
+        "games_started": len(started),
+        "requests": requests,
+        "seconds": round(seconds, 3),
+        "requests_per_second": round(requests / seconds, 2) if seconds else None,
+        "moves_per_second": round(len(played) / seconds, 2) if seconds else None,
+        "error_rate": (
+            sum(1 for s in statuses if s != 200 and s != 429) / requests if requests else 0.0
+        ),
+        "rate_limited_rate": statuses.count(429) / requests if requests else 0.0,
+        "new_game_ms": percentiles([elapsed for _, _, elapsed, _ in started]),
+        "play_ms": percentiles(total),
+        "queue_ms": percentiles(queue),
+        "search_ms": percentiles(search),
+        "overhead_ms": percentiles(overhead),
+    }
+
+
+def in_process_app(directory: str):
+    """
+    Imports the app with its session files and game log in the given directory.
+
+    Parameters:
+    directory (str): The directory for the app's files.
+
+    Returns:
+    module: The imported app module.
+    """
+    os.environ["CONNECT4_SESSION_DIR"] = os.path.join(directory, "flask_session")
+    os.environ["CONNECT4_GAME_LOG"] = os.path.join(directory, "games.jsonl")
+    import glog
+    import app
+
+    glog.setLevel(glog.WARNING)
+    return app
+
+
+def run(players, concurrency, sizes, difficulty, think=0.0, seed=None, url=None):
+    """
+    Runs a load test.
+
+    Parameters:
+    players (int): The number of simulated players, each playing one game.
+    concurrency (int): The number of players playing at the same time.
+    sizes (list): The (rows, cols) board sizes, assigned to players in turn.
+    difficulty (str): The difficulty tier every game is played against.
+    think (float): The seconds every player waits before each move.
+    seed (int): The seed of the players' moves.
+    url (str): The base URL of a running server; the app is driven in-process if omitted,
+        which imports it, so do this once per process.
+
+    Returns:
+    dict: The report, see `summarize`.
+    """
+    streams = np.random.SeedSequence(seed).spawn(players)
+
+    def player(index):
+        if url is None:
+            address = f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}"
+            transport = TestClientTransport(app_module.app, address)
+        else:
+            transport = HttpTransport(url)
+        rows, cols = sizes[index % len(sizes)]
+        return play_game(
+            transport, rows, cols, difficulty, think, np.random.default_rng(streams[index])
+        )
+
+    def play_all():
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(player, range(players)))
+        return summarize(results, time.perf_counter() - started)
+
+    if url is not None:
+        return play_all()
+    with tempfile.TemporaryDirectory(prefix="connect4-loadtest-") as directory:
+        app_module = in_process_app(directory)
+        try:
+            return play_all()
+        finally:
+            app_module.game_log.close()
+
+
+def parse_sizes(text: str) -> list:
+    """
+    Parses a comma-separated list of board sizes.
+
+    Parameters:
+    text (str): The sizes, e.g. "6x7,6x5".
+
+    Returns:
+    list: The (rows, cols) pair of every size.
+    """
+    sizes = []
+    for size in text.split(","):
+        rows, _, cols = size.strip().partition("x")
+        sizes.append((int(rows), int(cols)))
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Connect Four app.")
+    parser.add_argument("--players", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--sizes", type=parse_sizes, default=[(6, 7), (6, 5)])
+    parser.add_argument("--difficulty", default="easy")
+    parser.add_argument("--think", type=float, default=0.0, help="Seconds before a move.")
+    parser.add_argument("--seed", type=int, help="Seed for the players' moves.")
+    parser.add_argument("--url", help="Base URL of a running server to test instead.")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args()
+
+    report = run(
+        args.players,
+        args.concurrency,
+        args.sizes,
+        args.difficulty,
+        args.think,
+        args.seed,
+        args.url,
+    )
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(
+        f"{report['players']} players, {report['requests']} requests in "
+        f"{report['seconds']:.1f} s: {report['requests_per_second']} req/s, "
+        f"{report['moves_per_second']} moves/s"
+    )
+    print(
+        f"errors {report['error_rate']:.2%}, rate limited {report['rate_limited_rate']:.2%}"
+    )
+    print(f"{'latency (ms)':>14} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name in ("new_game", "play", "queue", "search", "overhead"):
+        stats = report[f"{name}_ms"]
+        print(
+            f"{name:>14} "
+            + " ".join(f"{'-' if v is None else v:>9}" for v in stats.values())
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import GameLog
+from GameLog import iter_games, replay
+from GameRecord import GameRecord
+
+
+def test_record_round_trips_through_dict():
+    record = GameRecord(6, 7, 4, [3, 3, 2, 4])
+
+    rebuilt = GameRecord.from_dict(record.to_dict())
+
+    assert rebuilt.moves == record.moves
+    np.testing.assert_array_equal(rebuilt.board().get_board(), record.board().get_board())
+
+
+def test_record_rejects_full_column():
+    record = GameRecord(2, 3, 2, [0, 0])
+
+    with pytest.raises(ValueError):
+        record.play(0)
+    assert record.moves == [0, 0]
+
+
+def test_append_then_replay(tmp_path):
+    path = str(tmp_path / "games.jsonl")
+    record = GameRecord(6, 7, 4, [3, 4, 3, 4, 3, 4, 3])
+    log = GameLog.GameLog(path)
+    log.append("GAME", record, difficulty="easy")
+    log.close()
+
+    (entry, logged), = iter_games(path)
+    assert entry["winner"] == 0
+    assert entry["difficulty"] == "easy"
+    assert logged.moves == record.moves
+    np.testing.assert_array_equal(
+        replay(path, "GAME", 3).get_board(), record.board_at(3).get_board()
+    )
+    assert replay(path, "MISSING") is None
+
+
+def test_pending_games_are_fsynced_on_the_interval(tmp_path, monkeypatch):
+    synced = threading.Event()
+    monkeypatch.setattr(GameLog.os, "fsync", lambda fd: synced.set())
+    log = GameLog.GameLog(str(tmp_path / "games.jsonl"), fsync_interval=0.05)
+    try:
+        log.append("GAME", GameRecord(6, 7, 4, [3]))
+        assert synced.wait(2.0)
+    finally:
+        log.close()
+
+
+def test_close_leaves_no_syncer_thread(tmp_path):
+    before = threading.active_count()
+    log = GameLog.GameLog(str(tmp_path / "games.jsonl"), fsync_every=1)
+    for i in range(20):
+        log.append(str(i), GameRecord(6, 7, 4, [i % 7]))
+    assert threading.active_count() == before + 1
+
+    log.close()
+
+    deadline = time.monotonic() + 2.0
+    while threading.active_count() > before and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert threading.active_count() == before
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from Engine import mcts_n
+from GameRecord import GameRecord
+from MCTSTreeNode import MCTSTreeNode
+
+
+def random_position(seed, rows=6, cols=7, plies=6):
+    """Play random moves from an empty board until an unfinished, asymmetric position."""
+    rng = np.random.default_rng(seed)
+    while True:
+        record = GameRecord(rows, cols)
+        for _ in range(plies):
+            valid = record.board().valid_moves()
+            record.play(valid[rng.integers(len(valid))])
+            if record.is_over():
+                break
+        if not record.is_over() and not record.board().is_symmetric():
+            return record
+
+
+def root_for(board, player):
+    return MCTSTreeNode(board, None, player, player ^ 1)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_mirrored_positions_choose_mirrored_moves(seed):
+    record = random_position(seed)
+    board = record.board()
+    player = record.turn()
+
+    chosen = mcts_n(root_for(board, player), 60, rng=np.random.default_rng(seed))
+    mirrored = mcts_n(root_for(board.mirrored(), player), 60, rng=np.random.default_rng(seed))
+
+    np.testing.assert_array_equal(
+        chosen.state.get_board(), mirrored.state.get_board()[:, ::-1]
+    )
+
+
+def test_mirrored_search_keeps_subtree():
+    record = GameRecord(6, 7, moves=[5, 4])
+    assert not record.board().is_canonical()
+    root = root_for(record.board(), record.turn())
+
+    chosen = mcts_n(root, 300, rng=np.random.default_rng(0))
+
+    assert chosen.parent is root
+    assert chosen.children
+    for child in chosen.children:
+        changed = child.state.get_board() != chosen.state.get_board()
+        assert np.count_nonzero(changed) == 1
@@ -0,0 +1,87 @@
+import copy
+
+import numpy as np
+import pytest
+
+from Board import Board
+from Engine import forced_move
+from MCTSTreeNode import MCTSTreeNode
+
+
+def recounted(board):
+    fresh = Board(board.rows, board.cols, board.win_length)
+    fresh.set_whole_board(board.get_board().copy())
+    return fresh
+
+
+def random_play(rows, cols, win_length, seed):
+    """Yield the board after every move of a random game that stops at the first win."""
+    rng = np.random.default_rng(seed)
+    board = Board(rows, cols, win_length)
+    board.line_counts()
+    player = 0
+    while board.valid_moves() and board.check_win() == 2:
+        moves = board.valid_moves()
+        col = moves[rng.integers(len(moves))]
+        board.set_board(board.get_next_open_row(col), col, player)
+        player ^= 1
+        yield board
+
+
+@pytest.mark.parametrize("size", [(6, 7, 4), (5, 5, 3), (7, 9, 5)])
+def test_line_counts_follow_set_board_and_deepcopy(size):
+    for seed in range(5):
+        for board in random_play(*size, seed):
+            copied = copy.deepcopy(board)
+            np.testing.assert_array_equal(board.line_counts(), recounted(board).line_counts())
+            np.testing.assert_array_equal(copied.line_counts(), board.line_counts())
+            assert board.check_win() == recounted(board).check_win()
+
+
+@pytest.mark.parametrize("size", [(6, 7, 4), (5, 5, 3)])
+def test_threats_match_brute_force(size):
+    for seed in range(3):
+        for board in random_play(*size, seed):
+            if board.check_win() != 2:
+                continue
+            for player in (0, 1):
+                threats = board.threats(player)
+                for row, col in np.argwhere(board.get_board() == 2):
+                    after = recounted(board)
+                    after.set_board(row, col, player)
+                    assert threats[row, col] == (after.check_win() == player)
+
+
+def test_forced_move_prefers_win_over_block():
+    board = Board(6, 7)
+    for row in (5, 4, 3):
+        board.set_board(row, 0, 1)
+    for col in (4, 5, 6):
+        board.set_board(5, col, 0)
+
+    assert board.winning_moves(1) == [0]
+    assert board.winning_moves(0) == [3]
+    assert forced_move(board, 1) == 0
+    assert forced_move(board, 0) == 3
+
+
+def test_forced_move_blocks():
+    board = Board(6, 7)
+    for col in (4, 5, 6):
+        board.set_board(5, col, 0)
+
+    assert forced_move(board, 1) == 3
+
+
+def test_losing_moves_are_not_forced_and_are_pruned():
+    board = Board(6, 7)
+    for col, value in enumerate((1, 0, 1)):
+        board.set_board(5, col, value)
+    for col in (0, 1, 2):
+        board.set_board(4, col, 0)
+
+    assert board.losing_moves(1) == [3]
+    assert forced_move(board, 1) is None
+    node = MCTSTreeNode(board, None, 1, 0)
+    assert all(child.get_board()[5, 3] == 2 for child in node.poss_child)
+    assert len(node.poss_child) == 6